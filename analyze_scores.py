@@ -12,22 +12,40 @@ Analyzes all three positions:
 - Back (5 cards)
 """
 
+import argparse
+import os
 import pickle
+import numpy as np
 import pandas as pd
-from typing import List, Tuple, Optional
 
+from poker import load_score_table
+from typing import Dict, List, Tuple, Optional, Union
+
+
+def load_scores(pkl_file: str, n: int) -> np.ndarray:
+    """Load all possible n-card scores from a dictionary file as a sorted array."""
+    table = load_score_table(pkl_file, n)
+    # Extract unique scores (np.unique sorts them)
+    return np.unique(table[~np.isnan(table)])
+
+
+SCORE_COLUMNS = ['Front Score', 'Middle Score', 'Back Score']
+INFO_COLUMNS = ['score', 'win_rate', 'category_percentage']
 
-def load_scores(pkl_file: str) -> List[float]:
-    """Load all possible scores from a pickle file and return them as a sorted list."""
-    with open(pkl_file, 'rb') as f:
-        score_data = pickle.load(f)
-    # Extract unique scores and sort them
-    all_scores = sorted(set(score_data.values()))
-    return all_scores
+
+def load_results(results_file: str) -> pd.DataFrame:
+    """Load the score columns of the game results CSV in a single pass."""
+    read_kwargs = dict(usecols=SCORE_COLUMNS, dtype={c: np.float64 for c in SCORE_COLUMNS})
+    try:
+        import pyarrow  # noqa: F401
+        read_kwargs['engine'] = 'pyarrow'
+    except ImportError:
+        pass
+    return pd.read_csv(results_file, **read_kwargs)
 
 
 def analyze_scores(
-    results_file: str,
+    results: Union[str, pd.DataFrame],
     score_column: str,
     possible_scores: Optional[List[float]] = None
 ) -> pd.DataFrame:
@@ -35,7 +53,8 @@ def analyze_scores(
     Analyze scores from game results for a specific position.
 
     Parameters:
-    - results_file: Path to the CSV file containing game results.
+    - results: Path to the CSV file containing game results, or the already
+      loaded results DataFrame.
     - score_column: Name of the column in the CSV that contains the scores.
     - possible_scores: Optional list of all possible scores. If not provided,
       unique scores from the results will be used.
@@ -43,56 +62,95 @@ def analyze_scores(
     Returns:
     - A DataFrame with columns: score, count, win_rate, category_percentage.
     """
-    # Load game results
-    df = pd.read_csv(results_file)
+    # Load game results unless they were passed in pre-parsed
+    df = pd.read_csv(results) if isinstance(results, str) else results
     if score_column not in df.columns:
-        raise ValueError(f"Column '{score_column}' not found in {results_file}")
+        source = results if isinstance(results, str) else 'results'
+        raise ValueError(f"Column '{score_column}' not found in {source}")
     scores = df[score_column].values
 
     # If possible_scores not provided, get unique scores from results
     if possible_scores is None:
         possible_scores = sorted(set(scores))
 
-    # Count occurrences of each score
-    score_counts = pd.Series(scores).value_counts()
+    # Count occurrences of each score; cumulative counts over the sorted
+    # index give the number of strictly smaller scores for every possible
+    # score in a single searchsorted pass
+    score_counts = pd.Series(scores).value_counts().sort_index()
+    counts = score_counts.values
+    idx = score_counts.index.values
+    cum = np.concatenate(([0], np.cumsum(counts)))
     total_count = len(scores)
 
-    # Initialize results list
-    results_list = []
+    score_arr = np.asarray(possible_scores, dtype=np.float64)
+    pos = np.searchsorted(idx, score_arr, side='left')
+    found = pos < len(idx)
+    found[found] = idx[pos[found]] == score_arr[found]
+    count_arr = np.zeros(len(score_arr), dtype=np.int64)
+    count_arr[found] = counts[pos[found]]
+
+    # Histogram of categories (integer part of the score), read once per score
+    categories = score_arr.astype(np.int64)
+    cat_counts = np.bincount(
+        np.floor(scores).astype(np.int64),
+        minlength=int(categories.max()) + 1 if len(categories) else 0
+    )
+    category_counts = np.where(categories >= 0, cat_counts[np.maximum(categories, 0)], 0)
+
+    # Win rate is the proportion of scores that are smaller
+    if total_count > 0:
+        win_rates = cum[pos] / total_count
+        category_percentages = (category_counts / total_count) * 100
+    else:
+        win_rates = np.zeros(len(score_arr), dtype=np.float64)
+        category_percentages = np.zeros(len(score_arr), dtype=np.float64)
 
-    # Calculate metrics for each possible score
-    for score in possible_scores:
-        # Count occurrences of this score
-        count = score_counts.get(score, 0)
+    # Convert to DataFrame
+    results_df = pd.DataFrame({
+        'score': possible_scores,
+        'count': count_arr,
+        'win_rate': win_rates,
+        'category_percentage': category_percentages
+    })
+    return results_df
 
-        # Calculate win rate (proportion of scores that are smaller)
-        smaller_count = sum(score_counts[score_counts.index < score])
-        win_rate = smaller_count / total_count if total_count > 0 else 0.0
 
-        # Calculate category percentage
-        category = int(score)
-        category_count = sum(
-            score_counts[(score_counts.index >= category) & (score_counts.index < category + 1)]
-        )
-        category_percentage = (category_count / total_count) * 100 if total_count > 0 else 0.0
+def save_info_bundle(df: pd.DataFrame, npz_file: str) -> None:
+    """Save the lookup columns of a results DataFrame as a compressed NumPy bundle."""
+    np.savez_compressed(npz_file, **{c: df[c].to_numpy(dtype=np.float64) for c in INFO_COLUMNS})
 
-        results_list.append({
-            'score': score,
-            'count': count,
-            'win_rate': win_rate,
-            'category_percentage': category_percentage
-        })
 
-    # Convert to DataFrame
-    results_df = pd.DataFrame(results_list)
-    return results_df
+def load_info(info_file: str) -> Dict[str, np.ndarray]:
+    """
+    Load the score, win_rate and category_percentage arrays of a position.
+
+    A '.npz' bundle saved next to the info file is preferred; otherwise the
+    pickled DataFrame is loaded and its lookup columns extracted.
+    """
+    npz_file = os.path.splitext(info_file)[0] + '.npz'
+    if os.path.exists(npz_file):
+        with np.load(npz_file) as bundle:
+            return {c: bundle[c] for c in INFO_COLUMNS}
+    with open(info_file, 'rb') as f:
+        df = pickle.load(f)
+    return {c: df[c].to_numpy(dtype=np.float64) for c in INFO_COLUMNS}
+
+
+def convert_info(pkl_file: str) -> None:
+    """Write the '.npz' lookup bundle for a pickled results DataFrame."""
+    with open(pkl_file, 'rb') as f:
+        df = pickle.load(f)
+    npz_file = os.path.splitext(pkl_file)[0] + '.npz'
+    save_info_bundle(df, npz_file)
+    print(f"Results saved to {npz_file}")
 
 
 def save_results(df: pd.DataFrame, position: str) -> None:
-    """Save the results DataFrame to both CSV and pickle files."""
+    """Save the results DataFrame to CSV, pickle and NumPy bundle files."""
     # Generate filenames
     csv_file = f'{position}_info.csv'
     pkl_file = f'{position}_info.pkl'
+    npz_file = f'{position}_info.npz'
 
     # Save CSV
     df.to_csv(csv_file, index=False)
@@ -100,26 +158,32 @@ def save_results(df: pd.DataFrame, position: str) -> None:
 
     # Save pickle
     with open(pkl_file, 'wb') as f:
-        pickle.dump(df, f)
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
     print(f"Results saved to {pkl_file}")
 
+    # Save lookup bundle
+    save_info_bundle(df, npz_file)
+    print(f"Results saved to {npz_file}")
+
 
 def analyze_position(
     position: str,
     pkl_file: str,
-    score_column: str
+    n: int,
+    score_column: str,
+    results: Union[str, pd.DataFrame] = 'results.csv'
 ) -> pd.DataFrame:
     """Analyze scores for a specific position and save the results."""
     print(f"\nAnalyzing {position} scores...")
 
     # Load possible scores
     print(f"Loading {position} scores from {pkl_file}...")
-    possible_scores = load_scores(pkl_file)
+    possible_scores = load_scores(pkl_file, n)
     print(f"Found {len(possible_scores)} possible scores")
 
     # Analyze scores
     print(f"Analyzing {position} scores from game results...")
-    results_df = analyze_scores('results.csv', score_column, possible_scores)
+    results_df = analyze_scores(results, score_column, possible_scores)
 
     # Print summary statistics
     print(f"\n{position} Summary Statistics:")
@@ -138,14 +202,29 @@ def analyze_position(
 
 def main() -> None:
     """Main entry point to analyze all three positions."""
-    positions: List[Tuple[str, str, str]] = [
-        ('Front', 'three_card.pkl', 'Front Score'),
-        ('Middle', 'five_card.pkl', 'Middle Score'),
-        ('Back', 'five_card.pkl', 'Back Score')
+    parser = argparse.ArgumentParser(description="Analyze Chinese Poker hand scores")
+    parser.add_argument(
+        '--convert',
+        nargs='+',
+        metavar='PKL',
+        help="Convert existing *_info.pkl files into .npz bundles and exit"
+    )
+    args = parser.parse_args()
+    if args.convert:
+        for pkl_file in args.convert:
+            convert_info(pkl_file)
+        return
+
+    positions: List[Tuple[str, str, int, str]] = [
+        ('Front', 'three_card.pkl', 3, 'Front Score'),
+        ('Middle', 'five_card.pkl', 5, 'Middle Score'),
+        ('Back', 'five_card.pkl', 5, 'Back Score')
     ]
 
-    for position, pkl_file, score_column in positions:
-        analyze_position(position, pkl_file, score_column)
+    # Parse the game results once and share them across positions
+    results = load_results('results.csv')
+    for position, pkl_file, n, score_column in positions:
+        analyze_position(position, pkl_file, n, score_column, results)
 
 
 if __name__ == "__main__":
@@ -25,37 +25,38 @@ Usage:
 """
 
 import argparse
-import csv
 import pickle
 import time
-from typing import List, Tuple, Dict, Generator, Union
-from poker import Card, Deck, card_to_id
+from typing import List, Tuple, Dict, Union
+
+import numpy as np
+import pandas as pd
+
+from poker import STR_TO_CARD, Card, Deck, card_to_id, load_score_table
+from poker_scores import BACK_SUB, MIDDLE_SUB, score_subsets, subset_strings
 
 
 def load_dictionaries(
     three_dict_file: str,
     five_dict_file: str
-) -> Tuple[Dict[Tuple[int, ...], float], Dict[Tuple[int, ...], float]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Load precomputed evaluation dictionaries from pickle files.
+    Load precomputed evaluation dictionaries as dense score tables, memory-mapping
+    '.npy' tables converted with poker.py --convert when they are present.
 
     Args:
         three_dict_file: Path to the 3-card dictionary pickle file.
         five_dict_file: Path to the 5-card dictionary pickle file.
 
     Returns:
-        A tuple containing the 3-card and 5-card evaluation dictionaries.
+        A tuple containing the 3-card and 5-card score tables, indexed by combination_rank.
 
     Raises:
         FileNotFoundError: If a dictionary file is missing.
         ValueError: If a dictionary file is corrupted or invalid.
     """
     try:
-        with open(three_dict_file, "rb") as f:
-            three_dict = pickle.load(f)
-        with open(five_dict_file, "rb") as f:
-            five_dict = pickle.load(f)
-        return three_dict, five_dict
+        return load_score_table(three_dict_file, 3), load_score_table(five_dict_file, 5)
     except FileNotFoundError as e:
         raise FileNotFoundError(f"Dictionary file not found: {e.filename}")
     except pickle.UnpicklingError:
@@ -75,20 +76,12 @@ def parse_hand(hand_str: str) -> List[Card]:
     Raises:
         ValueError: If the hand does not contain exactly 13 cards or has invalid formats.
     """
+    cards = hand_str.split()
+    if len(cards) != 13:
+        raise ValueError("Hand must contain exactly 13 cards")
     try:
-        cards = hand_str.split()
-        if len(cards) != 13:
-            raise ValueError("Hand must contain exactly 13 cards")
-
-        hand = []
-        for card_str in cards:
-            if len(card_str) > 2:  # Handle '10' rank
-                rank, suit = card_str[:-1], card_str[-1]
-            else:
-                rank, suit = card_str[0], card_str[1]
-            hand.append(Card(rank, suit))
-        return hand
-    except (IndexError, KeyError):
+        return [STR_TO_CARD[card_str] for card_str in cards]
+    except KeyError:
         raise ValueError("Invalid card format in hand")
 
 
@@ -105,110 +98,86 @@ def get_hand_ids(cards: List[Card]) -> Tuple[int, ...]:
     return tuple(sorted(card_to_id(card) for card in cards))
 
 
-def bit_combinations(n: int, r: int) -> Generator[int, None, None]:
+def find_valid_splits(
+    hand: List[Card],
+    three_table: np.ndarray,
+    five_table: np.ndarray
+) -> Tuple[List[Card], np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
-    Generate r-sized combinations of indices from 0 to n-1 using bit operations.
+    Find the valid front/middle/back splits of a 13-card hand as subset indices.
 
     Args:
-        n: Total number of items.
-        r: Size of combinations to generate.
+        hand: List of 13 Card objects.
+        three_table: 3-card scores indexed by combination_rank.
+        five_table: 5-card scores indexed by combination_rank.
 
-    Yields:
-        Integer bit pattern where each set bit represents a selected index.
+    Returns:
+        The hand's cards sorted by card ID, then for every valid arrangement its
+        front row in FRONT_IDX, middle and back rows in FIVE_IDX, and the front,
+        middle and back scores.
     """
-    start = (1 << r) - 1
-    max_val = 1 << n
-    while start < max_val:
-        yield start
-        c = start & -start
-        r = start + c
-        start = (((r ^ start) >> 2) // c) | r
+    # Precompute sorted card IDs and cards
+    hand_ids = [(card_to_id(card), card) for card in hand]
+    hand_ids.sort(key=lambda x: x[0])
+    all_ids = [id_ for id_, _ in hand_ids]
+    all_cards = [card for _, card in hand_ids]
+
+    # Score every 3-card and 5-card subset of the hand once (NaN if missing)
+    front_scores, five_scores = score_subsets(np.array(all_ids), three_table, five_table)
+
+    # Validate every (front, middle/back split) pair in one pass:
+    # front < middle <= back
+    middle_scores = five_scores[MIDDLE_SUB]
+    back_scores = five_scores[BACK_SUB]
+    mask = (middle_scores > front_scores[:, None]) & (middle_scores <= back_scores)
+    fronts, splits = np.nonzero(mask)
+
+    return (
+        all_cards,
+        fronts,
+        MIDDLE_SUB[fronts, splits],
+        BACK_SUB[fronts, splits],
+        front_scores[fronts],
+        middle_scores[fronts, splits],
+        back_scores[fronts, splits],
+    )
 
 
 def find_valid_arrangements(
     hand: List[Card],
-    three_dict: Dict[Tuple[int, ...], float],
-    five_dict: Dict[Tuple[int, ...], float]
+    three_table: np.ndarray,
+    five_table: np.ndarray
 ) -> List[Dict[str, Union[str, float]]]:
     """
     Find all valid Chinese Poker arrangements for a 13-card hand.
 
     Args:
         hand: List of 13 Card objects.
-        three_dict: Dictionary mapping 3-card ID tuples to scores.
-        five_dict: Dictionary mapping 5-card ID tuples to scores.
+        three_table: 3-card scores indexed by combination_rank.
+        five_table: 5-card scores indexed by combination_rank.
 
     Returns:
         List of dictionaries with card strings and scores for valid arrangements.
     """
-    # Precompute sorted card IDs and cards
-    hand_ids = [(card_to_id(card), card) for card in hand]
-    hand_ids.sort(key=lambda x: x[0])
-    all_ids = [id_ for id_, _ in hand_ids]
-    all_cards = [card for _, card in hand_ids]
+    all_cards, *splits = find_valid_splits(hand, three_table, five_table)
 
-    # Precompute 3-card scores
-    three_scores = {}
-    for bits in bit_combinations(13, 3):
-        indices = [i for i in range(13) if bits & (1 << i)]
-        ids = tuple(all_ids[i] for i in indices)
-        try:
-            three_scores[bits] = (three_dict[ids], indices)
-        except KeyError:
-            continue  # Skip invalid combinations
-
-    # Precompute 5-card scores
-    five_scores = {}
-    for bits in bit_combinations(13, 5):
-        indices = [i for i in range(13) if bits & (1 << i)]
-        ids = tuple(all_ids[i] for i in indices)
-        try:
-            five_scores[bits] = (five_dict[ids], indices)
-        except KeyError:
-            continue  # Skip invalid combinations
+    # Join each 3-card and 5-card subset's card string once per hand and
+    # look them up by subset index for every valid arrangement
+    front_strs, five_strs = subset_strings([str(card) for card in all_cards])
 
     valid_arrangements: List[Dict[str, Union[str, float]]] = []
-
-    # Iterate through all possible front combinations
-    for front_bits in three_scores:
-        front_score, front_indices = three_scores[front_bits]
-        remaining_mask = ((1 << 13) - 1) ^ front_bits
-        remaining_count = bin(remaining_mask).count("1")
-
-        # Iterate through middle combinations from remaining cards
-        for middle_bits in bit_combinations(remaining_count, 5):
-            actual_middle = 0
-            src_pos, dst_pos = 0, 0
-            while src_pos < 13:
-                if remaining_mask & (1 << src_pos):
-                    if middle_bits & (1 << dst_pos):
-                        actual_middle |= (1 << src_pos)
-                    dst_pos += 1
-                src_pos += 1
-
-            if actual_middle not in five_scores:
-                continue
-            middle_score, middle_indices = five_scores[actual_middle]
-            if middle_score <= front_score:
-                continue
-
-            # Compute back using remaining bits
-            back_bits = remaining_mask ^ actual_middle
-            if back_bits not in five_scores:
-                continue
-            back_score, back_indices = five_scores[back_bits]
-
-            # Validate arrangement
-            if middle_score <= back_score:
-                arrangement = {
-                    "Front": " ".join(str(all_cards[i]) for i in front_indices),
-                    "Front Score": front_score,
-                    "Middle": " ".join(str(all_cards[i]) for i in middle_indices),
-                    "Middle Score": middle_score,
-                    "Back": " ".join(str(all_cards[i]) for i in back_indices),
-                    "Back Score": back_score,
-                }
-                valid_arrangements.append(arrangement)
+    for k, middle_row, back_row, front_score, middle_score, back_score in zip(
+        *(column.tolist() for column in splits)
+    ):
+        arrangement = {
+            "Front": front_strs[k],
+            "Front Score": front_score,
+            "Middle": five_strs[middle_row],
+            "Middle Score": middle_score,
+            "Back": five_strs[back_row],
+            "Back Score": back_score,
+        }
+        valid_arrangements.append(arrangement)
 
     return valid_arrangements
 
@@ -226,10 +195,7 @@ def save_to_csv(arrangements: List[Dict[str, Union[str, float]]], filename: str)
     """
     fieldnames = ["Front", "Front Score", "Middle", "Middle Score", "Back", "Back Score"]
     try:
-        with open(filename, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(arrangements)
+        pd.DataFrame(arrangements, columns=fieldnames).to_csv(filename, index=False)
     except IOError as e:
         raise IOError(f"Error writing to CSV file: {e}")
 
@@ -256,7 +222,7 @@ def main() -> None:
 
     try:
         print("Loading dictionaries...")
-        three_dict, five_dict = load_dictionaries(args.three_dict, args.five_dict)
+        three_table, five_table = load_dictionaries(args.three_dict, args.five_dict)
         print("Dictionaries loaded.")
 
         if args.benchmark:
@@ -270,7 +236,7 @@ def main() -> None:
                 hand = deck.deal(1, cards_each=13)[0]
 
                 start_time = time.perf_counter()
-                arrangements = find_valid_arrangements(hand, three_dict, five_dict)
+                arrangements = find_valid_arrangements(hand, three_table, five_table)
                 end_time = time.perf_counter()
 
                 run_time = end_time - start_time
@@ -296,7 +262,7 @@ def main() -> None:
 
         # Compute arrangements
         start_time = time.perf_counter()
-        valid_arrangements = find_valid_arrangements(hand, three_dict, five_dict)
+        valid_arrangements = find_valid_arrangements(hand, three_table, five_table)
         end_time = time.perf_counter()
 
         # Display results
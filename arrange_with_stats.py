@@ -14,40 +14,39 @@ Usage:
 """
 
 import argparse
-import csv
 import pickle
 import time
-from typing import List, Tuple, Dict, Generator, Union
+from typing import List, Tuple, Dict, Optional, Union
+import numpy as np
+import pandas as pd
+from analyze_scores import load_info
 from expected_value import ExpectedValueCalculator
-from poker import Card, Deck, card_to_id
-
+from poker import STR_TO_CARD, Card, Deck, card_to_id, load_score_table
+from poker_scores import BACK_SUB, MIDDLE_SUB, score_subsets, subset_strings
 
 class HandStats:
     """
     Handles statistical calculations for hand arrangements in Chinese Poker.
 
-    Loads statistical data from pickle files and provides methods to retrieve
+    Loads statistical data from info files and provides methods to retrieve
     win rates and category percentages for given scores in front, middle,
     and back positions.
 
     Attributes:
-        front_info (pd.DataFrame): Statistical data for front position (3 cards).
-        middle_info (pd.DataFrame): Statistical data for middle position (5 cards).
-        back_info (pd.DataFrame): Statistical data for back position (5 cards).
-        front_stats (Dict[float, Dict[str, float]]): Lookup for front position stats.
-        middle_stats (Dict[float, Dict[str, float]]): Lookup for middle position stats.
-        back_stats (Dict[float, Dict[str, float]]): Lookup for back position stats.
+        front_info (Dict[str, np.ndarray]): Statistical data for front position (3 cards).
+        middle_info (Dict[str, np.ndarray]): Statistical data for middle position (5 cards).
+        back_info (Dict[str, np.ndarray]): Statistical data for back position (5 cards).
+        front_stats (Tuple[Dict[float, int], np.ndarray, np.ndarray]): Lookup for front position stats.
+        middle_stats (Tuple[Dict[float, int], np.ndarray, np.ndarray]): Lookup for middle position stats.
+        back_stats (Tuple[Dict[float, int], np.ndarray, np.ndarray]): Lookup for back position stats.
         ev_calculator (ExpectedValueCalculator): Instance for calculating expected values.
     """
 
     def __init__(self) -> None:
         """Initialize HandStats by loading data and setting up lookups."""
-        with open('Dict/front_info.pkl', 'rb') as f:
-            self.front_info = pickle.load(f)
-        with open('Dict/middle_info.pkl', 'rb') as f:
-            self.middle_info = pickle.load(f)
-        with open('Dict/back_info.pkl', 'rb') as f:
-            self.back_info = pickle.load(f)
+        self.front_info = load_info('Dict/front_info.pkl')
+        self.middle_info = load_info('Dict/middle_info.pkl')
+        self.back_info = load_info('Dict/back_info.pkl')
 
         self.front_stats = self._create_lookup(self.front_info)
         self.middle_stats = self._create_lookup(self.middle_info)
@@ -55,67 +54,70 @@ class HandStats:
 
         self.ev_calculator = ExpectedValueCalculator()
 
-    def _create_lookup(self, df: 'pd.DataFrame') -> Dict[float, Dict[str, float]]:
+    def _create_lookup(self, info: Dict[str, np.ndarray]) -> Tuple[Dict[float, int], np.ndarray, np.ndarray]:
         """
-        Create a dictionary for efficient score-based lookups.
+        Create flat arrays for efficient score-based lookups.
+
+        Scores are sorted and mapped to their position in parallel win-rate and
+        category-percentage arrays. Both arrays carry a trailing 0.0 entry so
+        that unknown scores can be resolved with index -1.
 
         Args:
-            df (pd.DataFrame): DataFrame containing score, win_rate, and category_percentage.
+            info (Dict[str, np.ndarray]): Arrays of score, win_rate, and category_percentage.
 
         Returns:
-            Dict[float, Dict[str, float]]: Mapping of scores to their statistics.
+            Tuple[Dict[float, int], np.ndarray, np.ndarray]: Mapping of scores to array
+            indices, win rates, and category percentages.
         """
-        return {
-            row['score']: {
-                'win_rate': row['win_rate'],
-                'category_percentage': row['category_percentage']
-            }
-            for _, row in df.iterrows()
-        }
-
-    def get_stats(self, score: float, position: str) -> Dict[str, float]:
+        order = np.argsort(info['score'], kind='stable')
+        scores = info['score'][order]
+        win_rates = np.append(info['win_rate'][order], 0.0)
+        category_percentages = np.append(info['category_percentage'][order], 0.0)
+        score_to_idx = {s: i for i, s in enumerate(scores.tolist())}
+        return score_to_idx, win_rates, category_percentages
+
+    def get_stats_batch(self, scores: np.ndarray, position: str) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Retrieve statistics for a score in a specific position.
+        Retrieve statistics for an array of scores in a specific position.
 
         Args:
-            score (float): The score to look up.
+            scores (np.ndarray): The scores to look up.
             position (str): Position ('front', 'middle', or 'back').
 
         Returns:
-            Dict[str, float]: Dictionary with 'win_rate' and 'category_percentage'.
+            Tuple[np.ndarray, np.ndarray]: Win rates and category percentages, 0.0
+            for unknown scores.
         """
-        lookup = {
+        score_to_idx, win_rates, category_percentages = {
             'front': self.front_stats,
             'middle': self.middle_stats,
             'back': self.back_stats
         }[position]
-        return lookup.get(score, {'win_rate': 0.0, 'category_percentage': 0.0})
+        idx = [score_to_idx.get(score, -1) for score in scores.tolist()]
+        return win_rates[idx], category_percentages[idx]
 
 
 def load_dictionaries(
     three_dict_file: str,
     five_dict_file: str
-) -> Tuple[Dict[Tuple[int, ...], float], Dict[Tuple[int, ...], float]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Load precomputed evaluation dictionaries from pickle files.
+    Load precomputed evaluation dictionaries as dense score tables, memory-mapping
+    '.npy' tables converted with poker.py --convert when they are present.
 
     Args:
         three_dict_file (str): Path to the three-card dictionary pickle file.
         five_dict_file (str): Path to the five-card dictionary pickle file.
 
     Returns:
-        Tuple[Dict[Tuple[int, ...], float], Dict[Tuple[int, ...], float]]: Three-card and five-card evaluation dictionaries.
+        Tuple[np.ndarray, np.ndarray]: Three-card and five-card score tables, indexed by combination_rank.
 
     Raises:
         FileNotFoundError: If a dictionary file is missing.
         ValueError: If a dictionary file has an invalid format.
     """
     try:
-        with open(three_dict_file, 'rb') as f:
-            three_dict = pickle.load(f)
-        with open(five_dict_file, 'rb') as f:
-            five_dict = pickle.load(f)
-        return three_dict, five_dict
+        return load_score_table(three_dict_file, 3), load_score_table(five_dict_file, 5)
     except FileNotFoundError as e:
         raise FileNotFoundError(f"Dictionary file not found: {e.filename}")
     except pickle.UnpicklingError:
@@ -135,22 +137,12 @@ def parse_hand(hand_str: str) -> List[Card]:
     Raises:
         ValueError: If the hand does not contain exactly 13 cards or contains invalid card formats.
     """
+    cards = hand_str.split()
+    if len(cards) != 13:
+        raise ValueError("Hand must contain exactly 13 cards")
     try:
-        cards = hand_str.split()
-        if len(cards) != 13:
-            raise ValueError("Hand must contain exactly 13 cards")
-
-        hand = []
-        for card_str in cards:
-            if len(card_str) > 2:  # Handle '10' rank
-                rank = card_str[:-1]
-                suit = card_str[-1]
-            else:
-                rank = card_str[0]
-                suit = card_str[1]
-            hand.append(Card(rank, suit))
-        return hand
-    except (IndexError, KeyError):
+        return [STR_TO_CARD[card_str] for card_str in cards]
+    except KeyError:
         raise ValueError("Invalid card format in hand")
 
 
@@ -167,115 +159,146 @@ def get_hand_ids(cards: List[Card]) -> Tuple[int, ...]:
     return tuple(sorted(card_to_id(card) for card in cards))
 
 
-def bit_combinations(n: int, r: int) -> Generator[int, None, None]:
-    """
-    Generate r-sized combinations of indices from 0 to n-1 using bit operations.
-
-    Args:
-        n (int): Total number of items.
-        r (int): Size of combinations to generate.
-
-    Yields:
-        int: Bit pattern where each set bit (1) represents a selected index.
-    """
-    start = (1 << r) - 1
-    max_val = 1 << n
-    while start < max_val:
-        yield start
-        c = start & -start
-        r = start + c
-        start = (((r ^ start) >> 2) // c) | r
-
-
 def find_arrangements_with_stats(
     hand: List[Card],
-    three_dict: Dict[Tuple[int, ...], float],
-    five_dict: Dict[Tuple[int, ...], float],
-    stats: HandStats
+    three_table: np.ndarray,
+    five_table: np.ndarray,
+    stats: HandStats,
+    limit: Optional[int] = None
 ) -> List[Dict[str, Union[str, float]]]:
     """
     Find all valid arrangements of a 13-card hand with statistical information.
 
     Args:
         hand (List[Card]): List of 13 Card objects.
-        three_dict (Dict[Tuple[int, ...], float]): Dictionary mapping 3-card tuples to scores.
-        five_dict (Dict[Tuple[int, ...], float]): Dictionary mapping 5-card tuples to scores.
+        three_table (np.ndarray): 3-card scores indexed by combination_rank.
+        five_table (np.ndarray): 5-card scores indexed by combination_rank.
         stats (HandStats): Instance providing statistical data for positions.
+        limit (Optional[int]): If given, only the top `limit` arrangements by
+            expected value are returned.
 
     Returns:
         List[Dict[str, Union[str, float]]]: List of dictionaries containing arrangement details,
-        including card strings, scores, win rates, category percentages, and expected values.
+        including card strings, scores, win rates, category percentages, and expected values,
+        sorted by expected value in descending order.
     """
-    arrangements: List[Dict[str, Union[str, float]]] = []
+    # Sort the hand by card ID once: any subset picked by ascending index is
+    # then already sorted for combination_rank
+    ids = np.array([card_to_id(card) for card in hand], dtype=np.int16)
+    order = np.argsort(ids)
+    sorted_ids = ids[order]
+    sorted_hand = [hand[i] for i in order]
+
+    # Score every 3-card and 5-card subset of the hand once (NaN if missing)
+    front_scores, five_scores = score_subsets(sorted_ids, three_table, five_table)
+
+    # Validate every (front, middle/back split) pair in one pass:
+    # back > middle > front
+    middle_scores = five_scores[MIDDLE_SUB]
+    back_scores = five_scores[BACK_SUB]
+    mask = (back_scores > middle_scores) & (middle_scores > front_scores[:, None])
+    fronts, splits = np.nonzero(mask)
+    middle_rows = MIDDLE_SUB[fronts, splits]
+    back_rows = BACK_SUB[fronts, splits]
+
+    # Look up position statistics once per subset, then gather them into
+    # parallel per-arrangement arrays
+    front_wr, front_cat = stats.get_stats_batch(front_scores, 'front')
+    middle_wr, middle_cat = stats.get_stats_batch(five_scores, 'middle')
+    back_wr, back_cat = stats.get_stats_batch(five_scores, 'back')
+    columns = {
+        'front_score': front_scores[fronts],
+        'middle_score': five_scores[middle_rows],
+        'back_score': five_scores[back_rows],
+        'front_win_rate': front_wr[fronts],
+        'middle_win_rate': middle_wr[middle_rows],
+        'back_win_rate': back_wr[back_rows],
+        'front_category': front_cat[fronts],
+        'middle_category': middle_cat[middle_rows],
+        'back_category': back_cat[back_rows],
+    }
+
+    # Expected values of all arrangements in a single vectorized call
+    ev = stats.ev_calculator.calculate_total_ev_vec(
+        columns['front_score'], columns['front_win_rate'],
+        columns['middle_score'], columns['middle_win_rate'],
+        columns['back_score'], columns['back_win_rate']
+    )
+    columns['expected_value'] = ev['total_ev']
+    columns['sweep_bonus_ev'] = ev['sweep_bonus_ev']
+    columns['overall_bonus_ev'] = ev['overall_bonus_ev']
+    for position in ('front', 'middle', 'back'):
+        columns[f'{position}_basic_ev'] = ev['basic_ev'][position]
+        columns[f'{position}_bonus_ev'] = ev['bonus_ev'][position]
+
+    # Rank by expected value (stable, so ties keep enumeration order) and
+    # only materialize the dictionaries that are returned
+    ranked = np.argsort(-ev['total_ev'], kind='stable')[:limit]
+    ordered = {name: values[ranked].tolist() for name, values in columns.items()}
+
+    # Stringify each card once, then join each subset's cards once; returned
+    # arrangements look their strings up by subset index
+    front_strs, five_strs = subset_strings([str(card) for card in sorted_hand])
 
-    # Generate all possible 3-card selections for the front
-    for front_bits in bit_combinations(13, 3):
-        front_cards = [hand[i] for i in range(13) if front_bits & (1 << i)]
-        middle_back_cards = [hand[i] for i in range(13) if not (front_bits & (1 << i))]
-
-        front_tuple = get_hand_ids(front_cards)
-        if front_tuple not in three_dict:
-            continue
-        front_score = three_dict[front_tuple]
-        front_stats = stats.get_stats(front_score, 'front')
-        front_win_rate = front_stats['win_rate']
-        front_category = front_stats['category_percentage']
-
-        # Generate all possible 5-card selections for the middle from the remaining 10 cards
-        for middle_bits in bit_combinations(10, 5):
-            middle_cards = [middle_back_cards[i] for i in range(10) if middle_bits & (1 << i)]
-            back_cards = [middle_back_cards[i] for i in range(10) if not (middle_bits & (1 << i))]
-
-            middle_tuple = get_hand_ids(middle_cards)
-            back_tuple = get_hand_ids(back_cards)
-            if middle_tuple not in five_dict or back_tuple not in five_dict:
-                continue
-
-            middle_score = five_dict[middle_tuple]
-            back_score = five_dict[back_tuple]
-            middle_stats = stats.get_stats(middle_score, 'middle')
-            middle_win_rate = middle_stats['win_rate']
-            middle_category = middle_stats['category_percentage']
-            back_stats = stats.get_stats(back_score, 'back')
-            back_win_rate = back_stats['win_rate']
-            back_category = back_stats['category_percentage']
-
-            # Validate arrangement: back > middle > front
-            if back_score > middle_score > front_score:
-                arrangement = {
-                    'front_score': front_score,
-                    'front_win_rate': front_win_rate,
-                    'middle_score': middle_score,
-                    'middle_win_rate': middle_win_rate,
-                    'back_score': back_score,
-                    'back_win_rate': back_win_rate
-                }
-                ev = stats.ev_calculator.calculate_total_ev(arrangement)
-
-                arrangement_info = {
-                    'front_cards': ' '.join(str(card) for card in front_cards),
-                    'middle_cards': ' '.join(str(card) for card in middle_cards),
-                    'back_cards': ' '.join(str(card) for card in back_cards),
-                    'front_score': front_score,
-                    'middle_score': middle_score,
-                    'back_score': back_score,
-                    'front_win_rate': front_win_rate,
-                    'middle_win_rate': middle_win_rate,
-                    'back_win_rate': back_win_rate,
-                    'front_category': front_category,
-                    'middle_category': middle_category,
-                    'back_category': back_category,
-                    'expected_value': ev['total_ev'],
-                    'basic_ev': ev['basic_ev'],
-                    'bonus_ev': ev['bonus_ev'],
-                    'sweep_bonus_ev': ev['sweep_bonus_ev'],
-                    'overall_bonus_ev': ev['overall_bonus_ev']
-                }
-                arrangements.append(arrangement_info)
+    arrangements: List[Dict[str, Union[str, float]]] = []
+    for j, (k, middle_row, back_row) in enumerate(zip(
+        fronts[ranked].tolist(),
+        middle_rows[ranked].tolist(),
+        back_rows[ranked].tolist(),
+    )):
+        arrangements.append({
+            'front_cards': front_strs[k],
+            'middle_cards': five_strs[middle_row],
+            'back_cards': five_strs[back_row],
+            'front_score': ordered['front_score'][j],
+            'middle_score': ordered['middle_score'][j],
+            'back_score': ordered['back_score'][j],
+            'front_win_rate': ordered['front_win_rate'][j],
+            'middle_win_rate': ordered['middle_win_rate'][j],
+            'back_win_rate': ordered['back_win_rate'][j],
+            'front_category': ordered['front_category'][j],
+            'middle_category': ordered['middle_category'][j],
+            'back_category': ordered['back_category'][j],
+            'expected_value': ordered['expected_value'][j],
+            'basic_ev': {
+                'front': ordered['front_basic_ev'][j],
+                'middle': ordered['middle_basic_ev'][j],
+                'back': ordered['back_basic_ev'][j],
+            },
+            'bonus_ev': {
+                'front': ordered['front_bonus_ev'][j],
+                'middle': ordered['middle_bonus_ev'][j],
+                'back': ordered['back_bonus_ev'][j],
+            },
+            'sweep_bonus_ev': ordered['sweep_bonus_ev'][j],
+            'overall_bonus_ev': ordered['overall_bonus_ev'][j]
+        })
 
     return arrangements
 
 
+ARRANGEMENT_COLUMNS = [
+    'front_cards', 'front_score', 'front_win_rate', 'front_category',
+    'middle_cards', 'middle_score', 'middle_win_rate', 'middle_category',
+    'back_cards', 'back_score', 'back_win_rate', 'back_category',
+    'expected_value', 'basic_ev', 'bonus_ev', 'sweep_bonus_ev', 'overall_bonus_ev'
+]
+
+
+def arrangements_to_frame(arrangements: List[Dict[str, Union[str, float]]]) -> pd.DataFrame:
+    """
+    Build a DataFrame of arrangements sorted by expected value in descending order.
+
+    Args:
+        arrangements (List[Dict[str, Union[str, float]]]): List of arrangement dictionaries.
+
+    Returns:
+        pd.DataFrame: One row per arrangement, with columns in ARRANGEMENT_COLUMNS order.
+    """
+    sorted_arrangements = sorted(arrangements, key=lambda x: x['expected_value'], reverse=True)
+    return pd.DataFrame.from_records(sorted_arrangements, columns=ARRANGEMENT_COLUMNS)
+
+
 def save_to_csv(arrangements: List[Dict[str, Union[str, float]]], filename: str) -> None:
     """
     Save arrangements to a CSV file, sorted by expected value in descending order.
@@ -284,16 +307,24 @@ def save_to_csv(arrangements: List[Dict[str, Union[str, float]]], filename: str)
         arrangements (List[Dict[str, Union[str, float]]]): List of arrangement dictionaries.
         filename (str): Path to the output CSV file.
     """
-    sorted_arrangements = sorted(arrangements, key=lambda x: x['expected_value'], reverse=True)
-    with open(filename, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'front_cards', 'front_score', 'front_win_rate', 'front_category',
-            'middle_cards', 'middle_score', 'middle_win_rate', 'middle_category',
-            'back_cards', 'back_score', 'back_win_rate', 'back_category',
-            'expected_value', 'basic_ev', 'bonus_ev', 'sweep_bonus_ev', 'overall_bonus_ev'
-        ])
-        writer.writeheader()
-        writer.writerows(sorted_arrangements)
+    arrangements_to_frame(arrangements).to_csv(filename, index=False)
+
+
+def save_to_feather(arrangements: List[Dict[str, Union[str, float]]], filename: str) -> None:
+    """
+    Save arrangements to an Arrow Feather file, sorted by expected value in descending order.
+
+    Feather is a binary columnar format that is much faster to write and read
+    than CSV for float-heavy data. Requires the optional pyarrow package.
+
+    Args:
+        arrangements (List[Dict[str, Union[str, float]]]): List of arrangement dictionaries.
+        filename (str): Path to the output Feather file.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    arrangements_to_frame(arrangements).to_feather(filename)
 
 
 def main() -> None:
@@ -301,7 +332,7 @@ def main() -> None:
     Main entry point for calculating Chinese Poker hand arrangements with statistics.
 
     Parses command-line arguments, processes a hand, finds valid arrangements,
-    and optionally saves results to a CSV file.
+    and optionally saves results to CSV and Feather files.
     """
     parser = argparse.ArgumentParser(
         description="Calculate Chinese Poker hand arrangements with statistical analysis."
@@ -319,6 +350,10 @@ def main() -> None:
         '--csv',
         help="Output CSV file name (e.g., 'arrangements.csv')"
     )
+    parser.add_argument(
+        '--feather',
+        help="Output Feather file name (e.g., 'arrangements.feather'); requires pyarrow"
+    )
     parser.add_argument(
         '--three_dict',
         default='three_card.pkl',
@@ -331,7 +366,7 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    three_dict, five_dict = load_dictionaries(args.three_dict, args.five_dict)
+    three_table, five_table = load_dictionaries(args.three_dict, args.five_dict)
     stats = HandStats()
 
     if args.random:
@@ -345,13 +380,16 @@ def main() -> None:
 
     print("Finding valid arrangements...")
     start_time = time.time()
-    arrangements = find_arrangements_with_stats(hand, three_dict, five_dict, stats)
+    arrangements = find_arrangements_with_stats(hand, three_table, five_table, stats)
     end_time = time.time()
 
     print(f"\nFound {len(arrangements)} valid arrangements in {end_time - start_time:.2f} seconds")
     if args.csv:
         save_to_csv(arrangements, args.csv)
         print(f"Results saved to {args.csv}")
+    if args.feather:
+        save_to_feather(arrangements, args.feather)
+        print(f"Results saved to {args.feather}")
 
 
 if __name__ == "__main__":
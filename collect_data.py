@@ -18,22 +18,47 @@ Usage:
 """
 
 import argparse
-import csv
+import gc
 import multiprocessing as mp
 import os
 import sys
-import threading
 import time
 from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from queue import Empty
-from typing import List, Dict, Tuple
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 from game_equilibrium import ChinesePokerGame, load_evaluation_dicts
 from poker import Deck
 
 
-@dataclass
+DICT_FILES = ("Dict/three_card.pkl", "Dict/five_card.pkl")
+
+# Evaluation tables of the current process. Workers inherit them from the
+# parent under fork, or attach to the parent's shared memory copies in
+# _init_worker, so chunk arguments never carry the tables.
+_THREE_TABLE: Optional[np.ndarray] = None
+_FIVE_TABLE: Optional[np.ndarray] = None
+# Shared memory blocks attached by this process, kept open while the tables are in use
+_SHARED_BLOCKS: List[shared_memory.SharedMemory] = []
+# Shared count of games finished by all workers, set up by _init_worker
+_COMPLETED: Optional[Any] = None
+# Random generator for dealing; every worker replaces it with a freshly
+# seeded one so forked workers do not deal the same games
+_RNG = np.random.default_rng()
+
+CSV_HEADERS = ["Game", "Player", "Front Score", "Middle Score", "Back Score", "Final Score"]
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
+TAIL_BLOCK_SIZE = 4096  # Bytes read from the end of the CSV to find the last game ID
+WRITE_BATCH_ROWS = 4 * 256  # Result rows gathered per DataFrame write (256 games, 4 rows each)
+LINE_TERMINATOR = "\r\n"  # As written by csv.writer, so appended files stay uniform
+
+
+@dataclass(frozen=True)
 class GameResult:
     """Stores the results of a single game for one player.
 
@@ -55,14 +80,14 @@ class GameResult:
 
 
 def simulate_game(
-    game_id: int, three_dict: Dict, five_dict: Dict, max_iter: int, verbose: bool = False
+    game_id: int, three_table: np.ndarray, five_table: np.ndarray, max_iter: int, verbose: bool = False
 ) -> List[GameResult]:
     """Simulate one game of Chinese Poker and return results for all players.
 
     Args:
         game_id: Unique identifier for the game.
-        three_dict: Dictionary mapping 3-card combinations to scores.
-        five_dict: Dictionary mapping 5-card combinations to scores.
+        three_table: 3-card scores indexed by combination_rank.
+        five_table: 5-card scores indexed by combination_rank.
         max_iter: Maximum iterations for Nash equilibrium search.
         verbose: If True, print progress during equilibrium search.
 
@@ -70,24 +95,27 @@ def simulate_game(
         A list of GameResult objects for all players in the game.
     """
     try:
-        deck = Deck()
+        # Deal with one permutation of the card IDs instead of shuffling Card objects
+        deck = Deck(_RNG)
         deck.shuffle()
         hands = deck.deal(4)
 
-        game = ChinesePokerGame(hands, three_dict, five_dict)
+        game = ChinesePokerGame(hands, three_table, five_table)
         game.find_nash_equilibrium(max_iter=max_iter, verbose=verbose)
 
-        results = [
-            GameResult(
-                game_id=game_id,
-                player_id=i + 1,
-                front_score=player.arrangements[player.current_strategy].front_eval,
-                middle_score=player.arrangements[player.current_strategy].middle_eval,
-                back_score=player.arrangements[player.current_strategy].back_eval,
-                final_score=player.payoffs[-1],
+        results = []
+        for i, player in enumerate(game.players):
+            arrangement = player.arrangements[player.current_strategy]
+            results.append(
+                GameResult(
+                    game_id,
+                    i + 1,
+                    arrangement.front_eval,
+                    arrangement.middle_eval,
+                    arrangement.back_eval,
+                    player.payoffs[-1],
+                )
             )
-            for i, player in enumerate(game.players)
-        ]
         return results
 
     except Exception as e:
@@ -98,6 +126,9 @@ def simulate_game(
 def get_last_game_id(csv_file: str) -> int:
     """Get the last game ID from an existing CSV file.
 
+    Games are appended in increasing order, so only the end of the file is
+    read; the block read grows until it holds a complete row.
+
     Args:
         csv_file: Path to the CSV file.
 
@@ -108,139 +139,161 @@ def get_last_game_id(csv_file: str) -> int:
         return 0
 
     try:
-        with open(csv_file, "r", newline="") as f:
-            next(f)  # Skip header
-            return max((int(line.split(",")[0]) for line in f if line.strip()), default=0)
-    except (ValueError, FileNotFoundError, StopIteration) as e:
+        with open(csv_file, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            block = TAIL_BLOCK_SIZE
+            while True:
+                start = max(0, size - block)
+                f.seek(start)
+                # Drop the first line: either cut off by the seek or the header
+                lines = f.read().splitlines()[1:]
+                game_ids = [int(line.split(b",", 1)[0]) for line in lines if line.strip()]
+                if game_ids or start == 0:
+                    return max(game_ids, default=0)
+                block *= 2
+    except (ValueError, FileNotFoundError) as e:
         print(f"Warning: Error reading last game ID: {e}", file=sys.stderr)
         return 0
 
 
-def write_results(results: List[GameResult], output_file: str, write_header: bool = False) -> None:
-    """Write or append game results to a CSV file.
+def write_results(results: List[GameResult], f: Any) -> None:
+    """Write game results to an open CSV file in one batch.
 
     Args:
         results: List of GameResult objects to write.
-        output_file: Path to the output CSV file.
-        write_header: If True, write the header row (used for new files).
+        f: The output file, kept open across chunks.
     """
-    mode = "w" if write_header else "a"
-    headers = ["Game", "Player", "Front Score", "Middle Score", "Back Score", "Final Score"]
-
-    with open(output_file, mode, newline="") as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow(headers)
-        for result in results:
-            writer.writerow(
-                [
-                    result.game_id,
-                    result.player_id,
-                    str(result.front_score),
-                    str(result.middle_score),
-                    str(result.back_score),
-                    f"{result.final_score:.1f}",
-                ]
-            )
+    df = pd.DataFrame(
+        {
+            "Game": np.array([r.game_id for r in results], dtype=np.int64),
+            "Player": np.array([r.player_id for r in results], dtype=np.int8),
+            "Front Score": np.array([r.front_score for r in results], dtype=np.float64),
+            "Middle Score": np.array([r.middle_score for r in results], dtype=np.float64),
+            "Back Score": np.array([r.back_score for r in results], dtype=np.float64),
+            # Rounded to match the '%.1f' final score format, written shortest-repr
+            "Final Score": np.round(np.array([r.final_score for r in results], dtype=np.float64), 1),
+        },
+        columns=CSV_HEADERS,
+    )
+    df.to_csv(f, header=False, index=False, lineterminator=LINE_TERMINATOR)
 
 
-def progress_monitor(total_games: int, result_queue: mp.Queue, done_event: threading.Event) -> int:
-    """Monitor simulation progress across all processes.
+def format_progress(
+    completed: int, success_count: int, total_games: int, elapsed: float, received: Optional[int] = None
+) -> str:
+    """Format a one-line progress report for the simulation.
 
     Args:
+        completed: Number of games finished so far.
+        success_count: Number of received games that produced results.
         total_games: Total number of games to simulate.
-        result_queue: Queue for receiving completion signals from processes.
-        done_event: Event to signal when all simulations are complete.
+        elapsed: Seconds since the simulation started.
+        received: Number of finished games whose results have been received,
+            if it lags behind completed. Defaults to completed.
 
     Returns:
-        The number of successfully completed games.
+        The progress line.
     """
-    success_count = 0
-    completed = 0
-    update_batch = 0
-    last_update = time.time()
-    start_time = time.time()
+    games_per_sec = completed / elapsed if elapsed > 0 else 0
+    eta = (total_games - completed) / games_per_sec if games_per_sec > 0 else 0
+    progress = completed / total_games * 100
+    if received is None:
+        received = completed
+    return (
+        f"Progress: {progress:6.1f}% | "
+        f"Games: {completed:4d}/{total_games:<4d} | "
+        f"Success: {success_count:3d}/{received:<3d} | "
+        f"Speed: {games_per_sec:5.1f} games/s | "
+        f"ETA: {eta:5.1f}s"
+    )
 
-    while not done_event.is_set() or not result_queue.empty():
-        try:
-            while True:
-                success = result_queue.get_nowait()
-                if success:
-                    success_count += 1
-                completed += 1
-                update_batch += 1
-
-                current_time = time.time()
-                if current_time - last_update >= 0.5 and update_batch > 0:
-                    elapsed = current_time - start_time
-                    games_per_sec = completed / elapsed if elapsed > 0 else 0
-                    eta = (total_games - completed) / games_per_sec if games_per_sec > 0 else 0
-                    progress = completed / total_games * 100
-
-                    msg = (
-                        f"Progress: {progress:6.1f}% | "
-                        f"Games: {completed:4d}/{total_games:<4d} | "
-                        f"Success: {success_count:3d}/{completed:<3d} | "
-                        f"Speed: {games_per_sec:5.1f} games/s | "
-                        f"ETA: {eta:5.1f}s"
-                    )
-                    sys.stdout.write(f"\r{msg}")
-                    sys.stdout.flush()
-
-                    update_batch = 0
-                    last_update = current_time
-
-        except Empty:
-            if update_batch > 0 and time.time() - last_update >= 0.5:
-                elapsed = time.time() - start_time
-                games_per_sec = completed / elapsed if elapsed > 0 else 0
-                eta = (total_games - completed) / games_per_sec if games_per_sec > 0 else 0
-                progress = completed / total_games * 100
-
-                msg = (
-                    f"Progress: {progress:6.1f}% | "
-                    f"Games: {completed:4d}/{total_games:<4d} | "
-                    f"Success: {success_count:3d}/{completed:<3d} | "
-                    f"Speed: {games_per_sec:5.1f} games/s | "
-                    f"ETA: {eta:5.1f}s"
-                )
-                sys.stdout.write(f"\r{msg}")
-                sys.stdout.flush()
 
-                update_batch = 0
-                last_update = time.time()
-            time.sleep(0.01)
+def share_tables(
+    tables: Tuple[np.ndarray, ...]
+) -> Tuple[List[shared_memory.SharedMemory], List[Tuple[str, Tuple[int, ...]]]]:
+    """Copy score tables into shared memory blocks for spawned workers.
 
-    elapsed = time.time() - start_time
-    games_per_sec = completed / elapsed if elapsed > 0 else 0
-    msg = (
-        f"\nCompleted!\n"
-        f"Total Games: {completed}/{total_games}\n"
-        f"Success Rate: {success_count}/{completed} ({100.0 * success_count / completed:.1f}%)\n"
-        f"Average Speed: {games_per_sec:.1f} games/s\n"
-        f"Total Time: {elapsed:.1f}s\n"
-    )
-    sys.stdout.write(msg)
-    sys.stdout.flush()
+    Args:
+        tables: The float64 score tables to share.
 
-    return success_count
+    Returns:
+        The created blocks, which the caller must close and unlink, and the
+        (name, shape) of each block for attach_table.
+    """
+    blocks, specs = [], []
+    for table in tables:
+        block = shared_memory.SharedMemory(create=True, size=max(table.nbytes, 1))
+        np.ndarray(table.shape, dtype=np.float64, buffer=block.buf)[...] = table
+        blocks.append(block)
+        specs.append((block.name, table.shape))
+    return blocks, specs
 
 
-def simulate_games_chunk(args: Tuple[List[int], Dict, Dict, int, bool]) -> List[GameResult]:
-    """Simulate a chunk of games in a single process.
+def attach_table(name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """View a score table stored in a shared memory block by share_tables.
 
     Args:
-        args: Tuple containing game_ids, three_dict, five_dict, max_iter, and verbose flag.
+        name: Name of the shared memory block.
+        shape: Shape of the table.
 
     Returns:
-        A list of GameResult objects for the chunk.
+        A read-only float64 array over the block.
     """
-    game_ids, three_dict, five_dict, max_iter, verbose = args
-    results = []
-    for game_id in game_ids:
-        game_results = simulate_game(game_id, three_dict, five_dict, max_iter, verbose)
-        results.extend(game_results)
-    return results
+    block = shared_memory.SharedMemory(name=name)
+    _SHARED_BLOCKS.append(block)
+    table = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    table.flags.writeable = False
+    return table
+
+
+def _init_worker(
+    three_file: str,
+    five_file: str,
+    shared: Optional[List[Tuple[str, Tuple[int, ...]]]] = None,
+    completed: Optional[Any] = None,
+) -> None:
+    """Set up the evaluation tables in a worker process unless inherited via fork.
+
+    Args:
+        three_file: Path to the 3-card dictionary file.
+        five_file: Path to the 5-card dictionary file.
+        shared: (name, shape) of the tables in shared memory, if the parent shared them.
+        completed: Shared multiprocessing.Value counting finished games, if any.
+    """
+    global _THREE_TABLE, _FIVE_TABLE, _RNG, _COMPLETED
+    _RNG = np.random.default_rng()
+    _COMPLETED = completed
+    if _THREE_TABLE is None or _FIVE_TABLE is None:
+        if shared:
+            _THREE_TABLE, _FIVE_TABLE = (attach_table(name, shape) for name, shape in shared)
+        else:
+            _THREE_TABLE, _FIVE_TABLE = load_evaluation_dicts(three_file, five_file)
+    # Objects alive after setup last for the worker's lifetime; keep them out
+    # of every later collection
+    gc.freeze()
+
+
+def simulate_one(game_id: int, max_iter: int, verbose: bool = False) -> List[GameResult]:
+    """Simulate one game with the evaluation tables of the current process.
+
+    Args:
+        game_id: Unique identifier for the game.
+        max_iter: Maximum iterations for Nash equilibrium search.
+        verbose: If True, print progress during equilibrium search.
+
+    Returns:
+        A list of GameResult objects for all players, empty if the game failed.
+    """
+    # A game allocates many short-lived, acyclic objects that reference
+    # counting frees, so cyclic collections during it are pure overhead
+    gc.disable()
+    try:
+        return simulate_game(game_id, _THREE_TABLE, _FIVE_TABLE, max_iter, verbose)
+    finally:
+        gc.enable()
+        if _COMPLETED is not None:
+            with _COMPLETED.get_lock():
+                _COMPLETED.value += 1
 
 
 def run_simulation(num_games: int, output_file: str, max_iter: int = 100) -> None:
@@ -251,66 +304,111 @@ def run_simulation(num_games: int, output_file: str, max_iter: int = 100) -> Non
         output_file: Path to the output CSV file.
         max_iter: Maximum iterations for Nash equilibrium search.
     """
+    global _THREE_TABLE, _FIVE_TABLE
     print("Loading evaluation dictionaries...")
-    three_dict, five_dict = load_evaluation_dicts("Dict/three_card.pkl", "Dict/five_card.pkl")
+    _THREE_TABLE, _FIVE_TABLE = load_evaluation_dicts(*DICT_FILES)
 
     start_game_id = get_last_game_id(output_file) + 1
     print(f"Starting from game ID: {start_game_id}")
 
-    result_queue = mp.Queue()
-    done_event = threading.Event()
-
-    monitor_thread = threading.Thread(
-        target=progress_monitor,
-        args=(num_games, result_queue, done_event),
-    )
-    monitor_thread.start()
+    completed = 0
+    success_count = 0
+    start_time = time.time()
+    last_update = start_time
+    shared_blocks: List[shared_memory.SharedMemory] = []
 
     try:
         num_processes = min(mp.cpu_count(), 8)
-        chunk_size = max(10, num_games // (num_processes * 4))
-        game_chunks = [
-            (
-                list(range(start_game_id + i, min(start_game_id + i + chunk_size, start_game_id + num_games))),
-                three_dict,
-                five_dict,
-                max_iter,
-                False,
-            )
-            for i in range(0, num_games, chunk_size)
-        ]
-
-        all_results = []
-        with ProcessPoolExecutor(max_workers=num_processes) as executor:
-            futures = [executor.submit(simulate_games_chunk, chunk) for chunk in game_chunks]
-            for future in futures:
-                chunk_results = future.result()
-                if chunk_results:
-                    write_header = not os.path.exists(output_file)
-                    write_results(chunk_results, output_file, write_header)
-                    all_results.extend(chunk_results)
-                    games_in_chunk = len(chunk_results) // 4
-                    for _ in range(games_in_chunk):
-                        result_queue.put(True)
-
-        done_event.set()
-        monitor_thread.join()
-
-        total_games = len(all_results) // 4
-        if total_games > 0:
+        # Fork lets workers share the parent's tables copy-on-write; otherwise
+        # they attach to one shared memory copy instead of loading their own
+        if "fork" in mp.get_all_start_methods():
+            mp_context = mp.get_context("fork")
+            specs = None
+        else:
+            mp_context = mp.get_context()
+            shared_blocks, specs = share_tables((_THREE_TABLE, _FIVE_TABLE))
+        # Workers count finished games here as they go, so progress does not
+        # wait for results to come back in order
+        completed_counter = mp_context.Value("i", 0)
+        initargs = DICT_FILES + (specs, completed_counter)
+        # Small batches per worker round-trip keep a slow game from stalling a
+        # whole core near the end of the run
+        chunksize = max(1, num_games // (num_processes * 32))
+        game_ids = range(start_game_id, start_game_id + num_games)
+
+        # Open the CSV once and stream every batch through a single buffered file;
+        # the header is decided once, and an existing but empty file still gets one
+        write_header = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+        with open(
+            output_file, "w" if write_header else "a", newline="", buffering=WRITE_BUFFER_SIZE
+        ) as f, ProcessPoolExecutor(
+            max_workers=num_processes,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=initargs,
+        ) as executor:
+            if write_header:
+                f.write(",".join(CSV_HEADERS) + LINE_TERMINATOR)
+            # Games come back in order; their results are written in batches
+            # so each DataFrame write covers many games. The batch buffer is
+            # allocated once and filled by index, four rows per game.
+            pending: List[Optional[GameResult]] = [None] * WRITE_BATCH_ROWS
+            num_pending = 0
+            try:
+                for game_results in executor.map(
+                    partial(simulate_one, max_iter=max_iter), game_ids, chunksize=chunksize
+                ):
+                    if game_results:
+                        pending[num_pending:num_pending + 4] = game_results
+                        num_pending += 4
+                        success_count += 1
+                    completed += 1
+                    if num_pending == WRITE_BATCH_ROWS:
+                        write_results(pending, f)
+                        num_pending = 0
+
+                    current_time = time.time()
+                    if current_time - last_update >= 0.5:
+                        msg = format_progress(
+                            max(completed_counter.value, completed),
+                            success_count,
+                            num_games,
+                            current_time - start_time,
+                            received=completed,
+                        )
+                        sys.stdout.write(f"\r{msg}")
+                        sys.stdout.flush()
+                        last_update = current_time
+            finally:
+                # Keep the games finished so far if the run is interrupted
+                if num_pending:
+                    write_results(pending[:num_pending], f)
+
+        elapsed = time.time() - start_time
+        games_per_sec = completed / elapsed if elapsed > 0 else 0
+        sys.stdout.write(
+            f"\nCompleted!\n"
+            f"Total Games: {completed}/{num_games}\n"
+            f"Success Rate: {success_count}/{completed} ({100.0 * success_count / max(completed, 1):.1f}%)\n"
+            f"Average Speed: {games_per_sec:.1f} games/s\n"
+            f"Total Time: {elapsed:.1f}s\n"
+        )
+        sys.stdout.flush()
+
+        if success_count > 0:
             print(f"\nResults written to: {output_file}")
         else:
             print("\nNo results generated!")
 
     except KeyboardInterrupt:
         print("\nSimulation interrupted by user.")
-        done_event.set()
-        monitor_thread.join()
     except Exception as e:
         print(f"\nError during simulation: {e}")
-        done_event.set()
-        monitor_thread.join()
         raise
+    finally:
+        for block in shared_blocks:
+            block.close()
+            block.unlink()
 
 
 def main() -> None:
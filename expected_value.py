@@ -17,10 +17,101 @@ Usage:
 
 import argparse
 import pickle
-from typing import Dict, Any
+from enum import IntEnum
+from typing import Dict, Any, Tuple, Union
+import numpy as np
 import pandas as pd
 
 
+class Position(IntEnum):
+    """Hand positions, used as indices into the per-position tables."""
+
+    FRONT = 0
+    MIDDLE = 1
+    BACK = 2
+
+
+# Every position is won or lost against 3 opponents
+BASE = 3.0
+# Probabilities of an opponent holding a bonus hand in each position
+P_FRONT_TRIPS = 0.0079  # Three of a kind
+P_MIDDLE_FULL_HOUSE = 0.0165  # Full house
+P_MIDDLE_QUADS = 0.00015  # Four of a kind
+P_BACK_QUADS = 0.0327  # Four of a kind
+P_BACK_STRAIGHT_FLUSH = 0.00865 + 0.00178  # Combined probability of royal flush
+
+
+# Expected loss per position when beaten, including opponents' bonus hands.
+# All inputs are constants, so it is evaluated once at import.
+_FRONT_LOSE = (
+    (1 - P_FRONT_TRIPS) ** 3 * BASE
+    + 3 * P_FRONT_TRIPS * (1 - P_FRONT_TRIPS) ** 2 * (BASE + 3)
+    + 3 * P_FRONT_TRIPS ** 2 * (1 - P_FRONT_TRIPS) * (BASE + 6)
+    + P_FRONT_TRIPS ** 3 * (BASE + 9)
+)
+_MIDDLE_LOSE = (
+    (1 - P_MIDDLE_FULL_HOUSE) ** 3 * (1 - P_MIDDLE_QUADS) ** 3 * BASE
+    + 3 * P_MIDDLE_FULL_HOUSE * (1 - P_MIDDLE_FULL_HOUSE) ** 2 * (1 - P_MIDDLE_QUADS) ** 3 * (BASE + 2)
+    + 3 * (1 - P_MIDDLE_FULL_HOUSE) ** 3 * P_MIDDLE_QUADS * (1 - P_MIDDLE_QUADS) ** 2 * (BASE + 4)
+    + (1 - (1 - P_MIDDLE_FULL_HOUSE) ** 3) * (1 - (1 - P_MIDDLE_QUADS) ** 3) * (BASE + 6)
+)
+_BACK_LOSE = (
+    (1 - P_BACK_QUADS) ** 3 * (1 - P_BACK_STRAIGHT_FLUSH) ** 3 * BASE
+    + 3 * P_BACK_QUADS * (1 - P_BACK_QUADS) ** 2 * (1 - P_BACK_STRAIGHT_FLUSH) ** 3 * (BASE + 4)
+    + 3 * (1 - P_BACK_QUADS) ** 3 * P_BACK_STRAIGHT_FLUSH * (1 - P_BACK_STRAIGHT_FLUSH) ** 2 * (BASE + 5)
+    + (1 - (1 - P_BACK_QUADS) ** 3) * (1 - (1 - P_BACK_STRAIGHT_FLUSH) ** 3) * (BASE + 9)
+)
+POS_LOSE = (_FRONT_LOSE, _MIDDLE_LOSE, _BACK_LOSE)
+
+
+def basic_ev_front(win_rate: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """Basic expected value of the front hand for a win rate (scalar or array)."""
+    return win_rate * BASE - (1 - win_rate) * _FRONT_LOSE
+
+
+def basic_ev_middle(win_rate: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """Basic expected value of the middle hand for a win rate (scalar or array)."""
+    return win_rate * BASE - (1 - win_rate) * _MIDDLE_LOSE
+
+
+def basic_ev_back(win_rate: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """Basic expected value of the back hand for a win rate (scalar or array)."""
+    return win_rate * BASE - (1 - win_rate) * _BACK_LOSE
+
+
+def basic_ev_batch(
+    front_wr: np.ndarray, middle_wr: np.ndarray, back_wr: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Basic expected values of many arrangements at once.
+
+    Args:
+        front_wr: Front win rates.
+        middle_wr: Middle win rates.
+        back_wr: Back win rates.
+
+    Returns:
+        The front, middle and back basic expected values.
+    """
+    return (
+        basic_ev_front(np.asarray(front_wr, dtype=np.float64)),
+        basic_ev_middle(np.asarray(middle_wr, dtype=np.float64)),
+        basic_ev_back(np.asarray(back_wr, dtype=np.float64)),
+    )
+
+
+# Bonus points per (position, category), paid by each of 3 opponents;
+# categories run from 0 to 10
+POS_BONUS = np.zeros((len(Position), 11))
+POS_BONUS[Position.FRONT, 4] = 3  # Three of a kind
+POS_BONUS[Position.MIDDLE, 7] = 2  # Full house
+POS_BONUS[Position.MIDDLE, 8] = 4  # Four of a kind
+POS_BONUS[Position.MIDDLE, 9:11] = 5  # Straight flush or royal flush
+POS_BONUS[Position.BACK, 8] = 4  # Four of a kind
+POS_BONUS[Position.BACK, 9:11] = 5  # Straight flush or royal flush
+# Python floats for scalar lookups
+_POS_BONUS_ROWS = POS_BONUS.tolist()
+
+
 class ExpectedValueCalculator:
     """Calculates expected values for Chinese Poker hands.
 
@@ -31,6 +122,9 @@ class ExpectedValueCalculator:
         front_categories (Dict[float, int]): Mapping of front scores to categories.
         middle_categories (Dict[float, int]): Mapping of middle scores to categories.
         back_categories (Dict[float, int]): Mapping of back scores to categories.
+        categories (List[Dict[float, int]]): The category maps, indexed by Position.
+        category_tables (List[np.ndarray]): Per-position arrays mapping rounded
+            scores to categories, for vectorized lookups, indexed by Position.
     """
 
     def __init__(self) -> None:
@@ -46,6 +140,9 @@ class ExpectedValueCalculator:
         self.middle_categories = self._create_category_map(self.middle_info)
         self.back_categories = self._create_category_map(self.back_info)
 
+        self.categories = [self.front_categories, self.middle_categories, self.back_categories]
+        self.category_tables = [self._create_category_table(c) for c in self.categories]
+
     def _create_category_map(self, df: pd.DataFrame) -> Dict[float, int]:
         """Create a mapping of scores to their categories.
 
@@ -55,103 +152,80 @@ class ExpectedValueCalculator:
         Returns:
             A dictionary mapping rounded scores to their integer categories.
         """
-        return {round(float(row['score'])): int(float(row['score'])) for _, row in df.iterrows()}
+        scores = df['score'].to_numpy(dtype=np.float64)
+        # np.round rounds half to even like the built-in round; astype truncates like int()
+        return dict(zip(np.round(scores).astype(np.int64).tolist(), scores.astype(np.int64).tolist()))
+
+    def _create_category_table(self, category_map: Dict[float, int]) -> np.ndarray:
+        """Create an array indexed by rounded score holding its category.
+
+        Args:
+            category_map: Mapping of rounded scores to their integer categories.
+
+        Returns:
+            An array with the category of every rounded score, 0 where unmapped.
+        """
+        table = np.zeros(max(max(category_map, default=0), 0) + 1, dtype=np.int64)
+        for rounded_score, category in category_map.items():
+            if rounded_score >= 0:
+                table[rounded_score] = category
+        return table
+
+    def _get_category_vec(self, scores: np.ndarray, position: Position) -> np.ndarray:
+        """Get the categories for an array of scores in a specific position.
+
+        Args:
+            scores: The scores to categorize.
+            position: The hand position.
 
-    def _get_category(self, score: float, position: str) -> int:
+        Returns:
+            The integer categories of the scores (0 for unknown scores).
+        """
+        table = self.category_tables[position]
+        # np.rint rounds half to even, like the built-in round
+        rounded = np.rint(scores)
+        in_range = (rounded >= 0) & (rounded < len(table))
+        idx = np.where(in_range, rounded, 0).astype(np.int64)
+        return np.where(in_range, table[idx], 0)
+
+    def _get_category(self, score: float, position: Position) -> int:
         """Get the category for a given score in a specific position.
 
         Args:
             score: The score to categorize.
-            position: The position ('front', 'middle', or 'back').
+            position: The hand position.
 
         Returns:
             The integer category of the score.
         """
-        rounded_score = round(score)
-        if position == 'front':
-            return self.front_categories.get(rounded_score, 0)
-        elif position == 'middle':
-            return self.middle_categories.get(rounded_score, 0)
-        else:  # back
-            return self.back_categories.get(rounded_score, 0)
-
-    def _calculate_basic_ev(self, score: float, win_rate: float, position: str) -> float:
+        return self.categories[position].get(round(score), 0)
+
+    def _calculate_basic_ev(self, score: float, win_rate: float, position: Position) -> float:
         """Calculate the basic expected value for a position.
 
         Args:
             score: The score of the hand in the position.
             win_rate: The win rate of the hand in the position.
-            position: The position ('front', 'middle', or 'back').
+            position: The hand position.
 
         Returns:
             The basic expected value for the position.
         """
-        if position == 'front':
-            base = 3.0  # Win/lose against 3 opponents
-            p = 0.0079  # Probability of three of a kind
-
-            lose_value = (
-                (1 - p) ** 3 * base
-                + 3 * p * (1 - p) ** 2 * (base + 3)
-                + 3 * p ** 2 * (1 - p) * (base + 6)
-                + p ** 3 * (base + 9)
-            )
-            return win_rate * base - (1 - win_rate) * lose_value
-
-        elif position == 'middle':
-            base = 3.0
-            p_fh = 0.0165  # Probability of full house
-            p_4k = 0.00015  # Probability of four of a kind
-
-            lose_value = (
-                (1 - p_fh) ** 3 * (1 - p_4k) ** 3 * base
-                + 3 * p_fh * (1 - p_fh) ** 2 * (1 - p_4k) ** 3 * (base + 2)
-                + 3 * (1 - p_fh) ** 3 * p_4k * (1 - p_4k) ** 2 * (base + 4)
-                + (1 - (1 - p_fh) ** 3) * (1 - (1 - p_4k) ** 3) * (base + 6)
-            )
-            return win_rate * base - (1 - win_rate) * lose_value
-
-        else:  # back
-            base = 3.0
-            p_4k = 0.0327  # Probability of four of a kind
-            p_rf = 0.00865 + 0.00178  # Combined probability of royal flush
-
-            lose_value = (
-                (1 - p_4k) ** 3 * (1 - p_rf) ** 3 * base
-                + 3 * p_4k * (1 - p_4k) ** 2 * (1 - p_rf) ** 3 * (base + 4)
-                + 3 * (1 - p_4k) ** 3 * p_rf * (1 - p_rf) ** 2 * (base + 5)
-                + (1 - (1 - p_4k) ** 3) * (1 - (1 - p_rf) ** 3) * (base + 9)
-            )
-            return win_rate * base - (1 - win_rate) * lose_value
-
-    def _calculate_bonus_ev(self, score: float, win_rate: float, position: str) -> float:
+        return win_rate * BASE - (1 - win_rate) * POS_LOSE[position]
+
+    def _calculate_bonus_ev(self, score: float, win_rate: float, position: Position) -> float:
         """Calculate the bonus expected value for special hands.
 
         Args:
             score: The score of the hand in the position.
             win_rate: The win rate of the hand in the position.
-            position: The position ('front', 'middle', or 'back').
+            position: The hand position.
 
         Returns:
             The bonus expected value for the position.
         """
-        category = self._get_category(score, position)
-        if position == 'front':
-            if category == 4:  # Three of a kind
-                return win_rate * 3 * 3  # Bonus * number of opponents
-        elif position == 'middle':
-            if category == 7:  # Full house
-                return win_rate * 2 * 3
-            elif category == 8:  # Four of a kind
-                return win_rate * 4 * 3
-            elif category in (9, 10):  # Straight flush or royal flush
-                return win_rate * 5 * 3
-        else:  # back
-            if category == 8:  # Four of a kind
-                return win_rate * 4 * 3
-            elif category in (9, 10):  # Straight flush or royal flush
-                return win_rate * 5 * 3
-        return 0.0
+        # Bonus * number of opponents
+        return win_rate * _POS_BONUS_ROWS[position][self._get_category(score, position)] * 3
 
     def _calculate_sweep_bonus_ev(self, front_wr: float, middle_wr: float, back_wr: float) -> float:
         """Calculate the expected value for sweeping opponents and being swept.
@@ -186,6 +260,66 @@ class ExpectedValueCalculator:
         best_all_prob = best_front_prob * best_middle_prob * best_back_prob
         return 18 * best_all_prob
 
+    def calculate_total_ev_vec(
+        self,
+        front_score: np.ndarray,
+        front_wr: np.ndarray,
+        middle_score: np.ndarray,
+        middle_wr: np.ndarray,
+        back_score: np.ndarray,
+        back_wr: np.ndarray,
+    ) -> Dict[str, Any]:
+        """Calculate the total expected values for many arrangements at once.
+
+        Element-wise equivalent of calculate_total_ev over parallel arrays.
+
+        Args:
+            front_score: Front scores of the arrangements.
+            front_wr: Front win rates of the arrangements.
+            middle_score: Middle scores of the arrangements.
+            middle_wr: Middle win rates of the arrangements.
+            back_score: Back scores of the arrangements.
+            back_wr: Back win rates of the arrangements.
+
+        Returns:
+            A dictionary with the same keys as calculate_total_ev, holding arrays.
+        """
+        front_basic_ev, middle_basic_ev, back_basic_ev = basic_ev_batch(front_wr, middle_wr, back_wr)
+
+        bonus = {}
+        for position, score, win_rate in (
+            (Position.FRONT, front_score, front_wr),
+            (Position.MIDDLE, middle_score, middle_wr),
+            (Position.BACK, back_score, back_wr),
+        ):
+            categories = self._get_category_vec(score, position)
+            bonus[position.name.lower()] = win_rate * POS_BONUS[position, categories] * 3
+
+        sweep_bonus_ev = self._calculate_sweep_bonus_ev(front_wr, middle_wr, back_wr)
+        # np.float_power matches the scalar ** exactly; ndarray ** 3 may take a
+        # multiply fast path that differs in the last bit
+        overall_bonus_ev = 18 * (
+            np.float_power(front_wr, 3) * np.float_power(middle_wr, 3) * np.float_power(back_wr, 3)
+        )
+
+        total_ev = (
+            front_basic_ev + middle_basic_ev + back_basic_ev
+            + bonus['front'] + bonus['middle'] + bonus['back']
+            + sweep_bonus_ev + overall_bonus_ev
+        )
+
+        return {
+            'total_ev': total_ev,
+            'basic_ev': {
+                'front': front_basic_ev,
+                'middle': middle_basic_ev,
+                'back': back_basic_ev,
+            },
+            'bonus_ev': bonus,
+            'sweep_bonus_ev': sweep_bonus_ev,
+            'overall_bonus_ev': overall_bonus_ev,
+        }
+
     def calculate_total_ev(self, arrangement: Dict[str, float]) -> Dict[str, Any]:
         """Calculate the total expected value for an arrangement.
 
@@ -203,13 +337,13 @@ class ExpectedValueCalculator:
         back_score = arrangement['back_score']
         back_wr = arrangement['back_win_rate']
 
-        front_basic_ev = self._calculate_basic_ev(front_score, front_wr, 'front')
-        middle_basic_ev = self._calculate_basic_ev(middle_score, middle_wr, 'middle')
-        back_basic_ev = self._calculate_basic_ev(back_score, back_wr, 'back')
+        front_basic_ev = self._calculate_basic_ev(front_score, front_wr, Position.FRONT)
+        middle_basic_ev = self._calculate_basic_ev(middle_score, middle_wr, Position.MIDDLE)
+        back_basic_ev = self._calculate_basic_ev(back_score, back_wr, Position.BACK)
 
-        front_bonus_ev = self._calculate_bonus_ev(front_score, front_wr, 'front')
-        middle_bonus_ev = self._calculate_bonus_ev(middle_score, middle_wr, 'middle')
-        back_bonus_ev = self._calculate_bonus_ev(back_score, back_wr, 'back')
+        front_bonus_ev = self._calculate_bonus_ev(front_score, front_wr, Position.FRONT)
+        middle_bonus_ev = self._calculate_bonus_ev(middle_score, middle_wr, Position.MIDDLE)
+        back_bonus_ev = self._calculate_bonus_ev(back_score, back_wr, Position.BACK)
 
         sweep_bonus_ev = self._calculate_sweep_bonus_ev(front_wr, middle_wr, back_wr)
         overall_bonus_ev = self._calculate_overall_bonus_ev(front_wr, middle_wr, back_wr)
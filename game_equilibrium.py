@@ -24,35 +24,141 @@ Dependencies:
 """
 
 import argparse
+import os
 import random
+import tempfile
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional, Any
 import numpy as np
-from poker import Card, Deck
+from poker import STR_TO_CARD, Card, Deck, score_table_file
 from scoring_fast import (
     Arrangement,
     load_evaluation_dicts,
     find_valid_arrangements,
-    compare_arrangements_fast,
-    calculate_overall_bonus_fast,
+    compare_arrangements_batch,
+    compare_arrangements_vec,
+    calculate_overall_bonus_rows,
+    overall_bonus_vec,
 )
 
+# The six (i, j) player pairs of a game, i < j, as index arrays
+PAIR_I = np.array([0, 0, 0, 1, 1, 2])
+PAIR_J = np.array([1, 2, 3, 2, 3, 3])
+
+# Most strategy profiles whose payoffs are kept, least recently used first out
+PAYOFF_CACHE_SIZE = 1 << 16
+
+# Score tables of an arrangement search worker process, set by init_arrangement_worker
+_WORKER_TABLES: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def init_arrangement_worker(three_file: str, five_file: str) -> None:
+    """Load the score tables once in a process pool worker used for arrangement search.
+
+    Args:
+        three_file: Path to the 3-card dictionary file or '.npy' score table.
+        five_file: Path to the 5-card dictionary file or '.npy' score table.
+    """
+    global _WORKER_TABLES
+    _WORKER_TABLES = load_evaluation_dicts(three_file, five_file)
+
+
+def find_arrangements_in_worker(hand: List[Card]) -> List[Arrangement]:
+    """Find the valid arrangements of a hand with the worker's score tables.
+
+    Args:
+        hand: The 13 cards of the hand.
+
+    Returns:
+        The valid arrangements of the hand.
+    """
+    return find_valid_arrangements(hand, *_WORKER_TABLES)
+
+
+def unique_arrangements(arrangements: List[Arrangement]) -> List[Arrangement]:
+    """Keep the first arrangement of each distinct (front, middle, back) score triple.
+
+    Payoffs depend on an arrangement only through its three scores, so
+    arrangements with equal scores are interchangeable strategies.
+
+    Args:
+        arrangements: The valid arrangements of a hand.
+
+    Returns:
+        One arrangement per score triple, in order of first occurrence.
+    """
+    unique: Dict[Tuple[float, float, float], Arrangement] = {}
+    for a in arrangements:
+        unique.setdefault((a.front_eval, a.middle_eval, a.back_eval), a)
+    return list(unique.values())
+
+
+def best_response_kernel(
+    player_evals: np.ndarray,
+    opponent_evals: List[np.ndarray],
+    columns: List[np.ndarray],
+    scratch: Optional[np.ndarray] = None,
+) -> Tuple[int, float]:
+    """Pick the best of a player's arrangements against fixed opponent arrangements.
+
+    Works on plain arrays only, so the best-response arithmetic runs as a few
+    whole-array operations with no per-arrangement Python work.
+
+    Args:
+        player_evals: (n, 3) array of front, middle and back scores of the player's arrangements.
+        opponent_evals: Front, middle and back scores of each opponent's arrangement.
+        columns: The player's pairwise score column against each opponent's arrangement.
+        scratch: Optional int64 buffer of length n that the payoffs are summed in.
+
+    Returns:
+        The index of the first arrangement with the highest payoff, and that payoff.
+    """
+    payoffs = overall_bonus_vec(player_evals, opponent_evals, out=scratch)
+    for column in columns:
+        payoffs += column
+    best = int(np.argmax(payoffs))
+    return best, float(payoffs[best])
+
 
 @dataclass
 class PlayerState:
-    """Represents a player's current state in the game."""
+    """Represents a player's current state in the game.
+
+    The current strategy is stored in the game's strategy profile array,
+    which the hot loops read directly; current_strategy is a view of the
+    player's slot in it.
+    """
 
     hand: List[Card]  # Original 13-card hand
-    arrangements: List[Arrangement]  # All valid arrangements
-    current_strategy: int  # Index of current chosen arrangement
+    arrangements: List[Arrangement]  # Valid arrangements, one per distinct score triple
+    strategies: np.ndarray  # The game's strategy profile, shared by all players
+    index: int  # This player's slot in strategies
     payoffs: List[float]  # Historical payoffs
+    _hand_str: str = field(init=False, repr=False)  # Sorted hand for display
+
+    def __post_init__(self) -> None:
+        """Format the hand once; it does not change during the game."""
+        self._hand_str = " ".join(
+            str(c) for c in sorted(self.hand, key=lambda c: (c.value, c.suit), reverse=True)
+        )
+
+    @property
+    def current_strategy(self) -> int:
+        """Index of current chosen arrangement."""
+        return int(self.strategies[self.index])
+
+    @current_strategy.setter
+    def current_strategy(self, strategy: int) -> None:
+        self.strategies[self.index] = strategy
 
     def __str__(self) -> str:
         """String representation of the player's state."""
         arr = self.arrangements[self.current_strategy]
         return (
-            f"Hand: {' '.join(str(c) for c in sorted(self.hand, key=lambda c: (c.value, c.suit), reverse=True))}\n"
+            f"Hand: {self._hand_str}\n"
             f"Current arrangement:\n{arr}\n"
             f"Current payoff: {self.payoffs[-1] if self.payoffs else 0}"
         )
@@ -64,16 +170,22 @@ class ChinesePokerGame:
     def __init__(
         self,
         hands: List[List[Card]],
-        three_dict: Dict[Tuple[int, ...], float],
-        five_dict: Dict[Tuple[int, ...], float],
+        three_table: np.ndarray,
+        five_table: np.ndarray,
+        executor: Optional[Executor] = None,
+        warm_start: bool = True,
     ) -> None:
         """
-        Initialize the game with four players' hands and evaluation dictionaries.
+        Initialize the game with four players' hands and evaluation tables.
 
         Args:
             hands: A list of four lists, each containing 13 Card objects.
-            three_dict: Evaluation dictionary for 3-card hands.
-            five_dict: Evaluation dictionary for 5-card hands.
+            three_table: Score table for 3-card hands, indexed by combination_rank.
+            five_table: Score table for 5-card hands, indexed by combination_rank.
+            executor: Optional process pool, created with init_arrangement_worker as
+                its initializer, to search the four hands' arrangements in parallel.
+            warm_start: If True, start each player at the arrangement with the highest
+                sum of front, middle and back scores; otherwise start at a random one.
 
         Raises:
             ValueError: If there are not exactly four players or if a player has no valid arrangements.
@@ -82,23 +194,80 @@ class ChinesePokerGame:
             raise ValueError("Must have exactly 4 players")
 
         self.players: List[PlayerState] = []
-        self.payoff_cache: Dict[Tuple[int, int, int, int], List[float]] = {}
+        # Current strategy of every player (the strategy profile)
+        self.strategies = np.zeros(4, dtype=np.int64)
+        self.payoff_cache: "OrderedDict[Tuple[int, ...], List[float]]" = OrderedDict()
+        # Front, middle and back scores of every arrangement, per player, as
+        # an array and as lists of Python floats for per-profile lookups
+        self.evals: List[np.ndarray] = []
+        self.eval_rows: List[List[List[float]]] = []
+        # (i, j, kj) -> scores of all of player i's arrangements against
+        # arrangement kj of player j, filled lazily by pair_column
+        self.pair_columns: Dict[Tuple[int, int, int], np.ndarray] = {}
+        # Per-player buffers the best-response payoffs are summed in, allocated
+        # once the arrangement counts are known
+        self._scratch: List[np.ndarray] = []
         self.history: List[Tuple[Tuple[int, int, int, int], List[float]]] = []
+        # Strategy profile -> indices in history where it occurred
+        self.profile_index: Dict[Tuple[int, int, int, int], List[int]] = {}
+        # Strategy profiles and payoffs of the history as rows of arrays grown
+        # in place; only the first len(history) rows are filled
+        self.strategy_history = np.empty((16, 4), dtype=np.int32)
+        self.payoff_history = np.empty((16, 4), dtype=np.float64)
         self.cycle_stats: Dict[str, Any] = {}
 
-        for hand in hands:
-            arrangements = find_valid_arrangements(hand, three_dict, five_dict)
+        # The four searches are independent; a process pool runs them on
+        # workers that hold their own tables, so only hands are sent
+        if executor is not None:
+            all_arrangements = list(executor.map(find_arrangements_in_worker, hands))
+        else:
+            all_arrangements = [find_valid_arrangements(hand, three_table, five_table) for hand in hands]
+
+        for index, (hand, arrangements) in enumerate(zip(hands, all_arrangements)):
             if not arrangements:
                 raise ValueError(f"No valid arrangements found for hand: {' '.join(str(c) for c in hand)}")
+            arrangements = unique_arrangements(arrangements)
 
             self.players.append(
                 PlayerState(
                     hand=hand,
                     arrangements=arrangements,
-                    current_strategy=random.randrange(len(arrangements)),
+                    strategies=self.strategies,
+                    index=index,
                     payoffs=[],
                 )
             )
+            self.evals.append(
+                np.array([(a.front_eval, a.middle_eval, a.back_eval) for a in arrangements], dtype=np.float64)
+            )
+            # The strongest arrangement overall is usually close to a best
+            # response already, so best-response dynamics need fewer sweeps
+            if warm_start:
+                self.strategies[index] = int(np.argmax(self.evals[-1].sum(axis=1)))
+            else:
+                self.strategies[index] = random.randrange(len(arrangements))
+            self.eval_rows.append(self.evals[-1].tolist())
+            self._scratch.append(np.empty(len(arrangements), dtype=np.int64))
+
+    def pair_column(self, i: int, j: int, kj: int) -> np.ndarray:
+        """Get the scores of all of player i's arrangements against one of player j's.
+
+        Columns are computed with one vectorized comparison on first use and cached.
+
+        Args:
+            i: Index of the player whose arrangements are scored.
+            j: Index of the opposing player.
+            kj: Index of the opposing player's arrangement.
+
+        Returns:
+            An array with player i's net score against player j for each of i's arrangements.
+        """
+        key = (i, j, kj)
+        column = self.pair_columns.get(key)
+        if column is None:
+            column = compare_arrangements_vec(self.evals[i], self.evals[j][kj])
+            self.pair_columns[key] = column
+        return column
 
     def compute_payoffs(self) -> List[float]:
         """Compute payoffs for the current arrangement choices.
@@ -106,23 +275,26 @@ class ChinesePokerGame:
         Returns:
             A list of four floats representing each player's payoff.
         """
-        strategy_key = tuple(p.current_strategy for p in self.players)
-        if strategy_key in self.payoff_cache:
-            return self.payoff_cache[strategy_key]
-
-        arrangements = [p.arrangements[p.current_strategy] for p in self.players]
-        scores = [0.0] * 4
-
-        for i in range(4):
-            for j in range(i + 1, 4):
-                score, _ = compare_arrangements_fast(arrangements[i], arrangements[j])
-                scores[i] += score
-                scores[j] -= score
-
-        bonus_scores = calculate_overall_bonus_fast(arrangements)
-        final_scores = [s + b for s, b in zip(scores, bonus_scores)]
+        strategy_key = tuple(self.strategies.tolist())
+        cached = self.payoff_cache.get(strategy_key)
+        if cached is not None:
+            self.payoff_cache.move_to_end(strategy_key)
+            return cached
+
+        # All six pairs are compared in one batch and credited to both players
+        profile_rows = [rows[k] for rows, k in zip(self.eval_rows, strategy_key)]
+        profile_evals = np.array(profile_rows)
+        pair_scores = compare_arrangements_batch(profile_evals[PAIR_I], profile_evals[PAIR_J])
+        scores = np.zeros(4)
+        np.add.at(scores, PAIR_I, pair_scores)
+        np.subtract.at(scores, PAIR_J, pair_scores)
+
+        bonus_scores = calculate_overall_bonus_rows(profile_rows)
+        final_scores = [s + b for s, b in zip(scores.tolist(), bonus_scores)]
 
         self.payoff_cache[strategy_key] = final_scores
+        if len(self.payoff_cache) > PAYOFF_CACHE_SIZE:
+            self.payoff_cache.popitem(last=False)
         return final_scores
 
     def find_best_response(self, player_idx: int) -> Tuple[int, float]:
@@ -134,22 +306,17 @@ class ChinesePokerGame:
         Returns:
             A tuple containing the best strategy index and its corresponding payoff.
         """
-        best_score = float("-inf")
-        best_strategy = self.players[player_idx].current_strategy
-
-        for i in range(len(self.players[player_idx].arrangements)):
-            old_strategy = self.players[player_idx].current_strategy
-            self.players[player_idx].current_strategy = i
-            payoffs = self.compute_payoffs()
-            score = payoffs[player_idx]
-
-            if score > best_score:
-                best_score = score
-                best_strategy = i
-
-            self.players[player_idx].current_strategy = old_strategy
-
-        return best_strategy, best_score
+        # Only the pairs involving the player change between candidates, so
+        # the player's payoff for every arrangement is the sum of its columns
+        # against the fixed opponents plus its overall bonus; argmax keeps the
+        # first of equal payoffs, as a strict > scan would
+        opponents = [(j, k) for j, k in enumerate(self.strategies.tolist()) if j != player_idx]
+        return best_response_kernel(
+            self.evals[player_idx],
+            [self.evals[j][k] for j, k in opponents],
+            [self.pair_column(player_idx, j, k) for j, k in opponents],
+            self._scratch[player_idx],
+        )
 
     def is_approximate_cycle(self, length: int, tolerance: float = 1e-6) -> bool:
         """Check if the last 'length' states form an approximate cycle.
@@ -161,19 +328,37 @@ class ChinesePokerGame:
         Returns:
             True if a cycle is detected, False otherwise.
         """
-        if len(self.history) < length * 2:
+        n = len(self.history)
+        if n < length * 2:
             return False
 
-        for i in range(length):
-            if self.history[-(i + 1)][0] != self.history[-(i + 1 + length)][0]:
-                return False
+        # Compare the last period with the one before it, row for row
+        if not np.array_equal(
+            self.strategy_history[n - length : n], self.strategy_history[n - 2 * length : n - length]
+        ):
+            return False
+        difference = self.payoff_history[n - length : n] - self.payoff_history[n - 2 * length : n - length]
+        return not (np.abs(difference) > tolerance).any()
 
-            curr_payoffs = self.history[-(i + 1)][1]
-            prev_payoffs = self.history[-(i + 1 + length)][1]
-            if any(abs(c - p) > tolerance for c, p in zip(curr_payoffs, prev_payoffs)):
-                return False
+    def record_history(self, strategies: Tuple[int, int, int, int], payoffs: List[float]) -> None:
+        """Append a strategy profile and its payoffs to the history and its indexes.
 
-        return True
+        Args:
+            strategies: The strategy profile.
+            payoffs: The payoffs of the profile.
+        """
+        n = len(self.history)
+        if n == len(self.payoff_history):
+            grown_strategies = np.empty((2 * n, 4), dtype=np.int32)
+            grown_strategies[:n] = self.strategy_history
+            self.strategy_history = grown_strategies
+            grown = np.empty((2 * n, 4), dtype=np.float64)
+            grown[:n] = self.payoff_history
+            self.payoff_history = grown
+        self.strategy_history[n] = strategies
+        self.payoff_history[n] = payoffs
+        self.profile_index.setdefault(strategies, []).append(n)
+        self.history.append((strategies, payoffs))
 
     def is_oscillating(self, length: int, tolerance: float = 2.0) -> bool:
         """Check if payoffs are oscillating with a given period.
@@ -185,18 +370,15 @@ class ChinesePokerGame:
         Returns:
             True if oscillation is detected, False otherwise.
         """
-        if len(self.history) < length * 3:
+        n = len(self.history)
+        if n < length * 3:
             return False
 
-        sequences = [[p[1][i] for p in self.history[-length * 3 :]] for i in range(4)]
-
-        for seq in sequences:
-            for offset in range(length):
-                values = seq[offset::length]
-                if max(values) - min(values) > tolerance:
-                    return False
-
-        return True
+        # The last three periods as (period, offset, player); each player's
+        # payoffs at the same offset must stay within tolerance
+        window = self.payoff_history[n - length * 3 : n].reshape(3, length, 4)
+        spread = window.max(axis=0) - window.min(axis=0)
+        return not (spread > tolerance).any()
 
     def analyze_cycle(self, cycle_start: int, cycle_length: int) -> Dict[str, Any]:
         """Analyze properties of a detected cycle.
@@ -208,15 +390,17 @@ class ChinesePokerGame:
         Returns:
             A dictionary containing cycle statistics.
         """
-        cycle = self.history[cycle_start : cycle_start + cycle_length]
+        end = cycle_start + cycle_length
+        # (cycle_length, 4) payoffs, reduced per player along axis 0
+        payoffs = self.payoff_history[cycle_start:end]
         stats = {
             "length": cycle_length,
-            "profiles": len(set(p[0] for p in cycle)),
-            "avg_payoffs": [np.mean([p[1][i] for p in cycle]) for i in range(4)],
-            "min_payoffs": [min(p[1][i] for p in cycle) for i in range(4)],
-            "max_payoffs": [max(p[1][i] for p in cycle) for i in range(4)],
-            "var_payoffs": [np.var([p[1][i] for p in cycle]) for i in range(4)],
-            "total_payoffs": [sum(p[1][i] for p in cycle) for i in range(4)],
+            "profiles": len(np.unique(self.strategy_history[cycle_start:end], axis=0)),
+            "avg_payoffs": payoffs.mean(axis=0).tolist(),
+            "min_payoffs": payoffs.min(axis=0).tolist(),
+            "max_payoffs": payoffs.max(axis=0).tolist(),
+            "var_payoffs": payoffs.var(axis=0).tolist(),
+            "total_payoffs": payoffs.sum(axis=0).tolist(),
         }
         return stats
 
@@ -232,18 +416,12 @@ class ChinesePokerGame:
         Returns:
             A tuple containing the best strategy profile and its payoffs.
         """
-        cycle = self.history[cycle_start : cycle_start + cycle_length]
-        scores = []
+        # Score every profile at once from its row of the (cycle_length, 4) payoffs
+        payoffs = self.payoff_history[cycle_start : cycle_start + cycle_length]
+        scores = 0.4 * payoffs.mean(axis=1) + 0.4 * payoffs.min(axis=1) - 0.2 * payoffs.var(axis=1)
 
-        for profile, payoffs in cycle:
-            avg_payoff = np.mean(payoffs)
-            min_payoff = min(payoffs)
-            var_payoff = np.var(payoffs)
-            score = 0.4 * avg_payoff + 0.4 * min_payoff - 0.2 * var_payoff
-            scores.append(score)
-
-        best_idx = np.argmax(scores)
-        return cycle[best_idx]
+        best_idx = int(np.argmax(scores))
+        return self.history[cycle_start + best_idx]
 
     def detect_cycle(self) -> Optional[Tuple[int, int]]:
         """Detect if the best-response dynamics have entered a cycle.
@@ -255,11 +433,16 @@ class ChinesePokerGame:
         if n < 2:
             return None
 
+        # An exact cycle of a given length needs the latest profile to have
+        # occurred that many steps earlier, so only those lengths are verified
+        occurrences = self.profile_index.get(self.history[-1][0], [])
+        candidate_lengths = {n - 1 - j for j in occurrences}
+
         for length in range(2, n // 2 + 1):
             if n < length * 2:
                 break
 
-            if self.is_approximate_cycle(length) or self.is_oscillating(length):
+            if (length in candidate_lengths and self.is_approximate_cycle(length)) or self.is_oscillating(length):
                 return (n - length, length)
 
         return None
@@ -281,11 +464,12 @@ class ChinesePokerGame:
         start_time = time.perf_counter()
         iteration = 0
         converged = False
+        # Payoffs of the current profile, carried over from the previous sweep
+        current_payoffs = self.compute_payoffs()
 
         while iteration < max_iter and not converged:
-            current_strategies = tuple(p.current_strategy for p in self.players)
-            current_payoffs = self.compute_payoffs()
-            self.history.append((current_strategies, current_payoffs))
+            current_strategies = tuple(self.strategies.tolist())
+            self.record_history(current_strategies, current_payoffs)
 
             cycle = self.detect_cycle()
             if cycle:
@@ -312,8 +496,8 @@ class ChinesePokerGame:
                     print(f"\nChosen profile with payoffs: {' '.join(f'{p:+.0f}' for p in best_payoffs)}")
                     print("(Selected based on weighted average of mean payoff, minimum payoff, and payoff stability)")
 
-                for i, strategy in enumerate(best_profile):
-                    self.players[i].current_strategy = strategy
+                self.strategies[:] = best_profile
+                for i in range(4):
                     self.players[i].payoffs.append(best_payoffs[i])
 
                 return False
@@ -322,7 +506,7 @@ class ChinesePokerGame:
 
             for i in range(4):
                 best_strategy, _ = self.find_best_response(i)
-                self.players[i].current_strategy = best_strategy
+                self.strategies[i] = best_strategy
 
             new_payoffs = self.compute_payoffs()
 
@@ -341,6 +525,7 @@ class ChinesePokerGame:
                 if verbose:
                     print("\nConverged to equilibrium!")
 
+            current_payoffs = new_payoffs
             iteration += 1
 
         if verbose and not converged:
@@ -362,19 +547,12 @@ def parse_hand(hand_str: str) -> List[Card]:
     Raises:
         ValueError: If the hand does not contain exactly 13 cards or has invalid card formats.
     """
+    cards = hand_str.split()
+    if len(cards) != 13:
+        raise ValueError("Each hand must contain exactly 13 cards")
     try:
-        cards = []
-        for card_str in hand_str.split():
-            if len(card_str) > 2:  # Handle '10'
-                rank, suit = card_str[:-1], card_str[-1]
-            else:
-                rank, suit = card_str[0], card_str[1]
-            cards.append(Card(rank, suit))
-
-        if len(cards) != 13:
-            raise ValueError("Each hand must contain exactly 13 cards")
-        return cards
-    except (IndexError, KeyError):
+        return [STR_TO_CARD[card_str] for card_str in cards]
+    except KeyError:
         raise ValueError(f"Invalid card format in hand: {hand_str}")
 
 
@@ -390,13 +568,19 @@ def main() -> None:
     parser.add_argument("--max_iter", type=int, default=100, help="Maximum iterations")
     parser.add_argument("--three_dict", default="three_card.pkl", help="Three-card dictionary file")
     parser.add_argument("--five_dict", default="five_card.pkl", help="Five-card dictionary file")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Processes for the arrangement search (0 to search serially)"
+    )
+    parser.add_argument(
+        "--random_start", action="store_true", help="Start from random arrangements instead of the strongest ones"
+    )
     args = parser.parse_args()
 
     total_start = time.perf_counter()
 
     print("Loading evaluation dictionaries...")
     dict_start = time.perf_counter()
-    three_dict, five_dict = load_evaluation_dicts(args.three_dict, args.five_dict)
+    three_table, five_table = load_evaluation_dicts(args.three_dict, args.five_dict)
     dict_time = time.perf_counter() - dict_start
 
     hands_start = time.perf_counter()
@@ -421,7 +605,23 @@ def main() -> None:
 
     print("\nFinding valid arrangements and computing equilibrium...")
     game_start = time.perf_counter()
-    game = ChinesePokerGame(hands, three_dict, five_dict)
+    if args.workers > 0:
+        # Workers memory-map the loaded tables from '.npy' files, saved to a
+        # temporary directory if they were unpickled, instead of each loading
+        # the dictionaries again
+        with tempfile.TemporaryDirectory() as table_dir, ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=init_arrangement_worker,
+            initargs=(
+                score_table_file(three_table, os.path.join(table_dir, "three_card.npy")),
+                score_table_file(five_table, os.path.join(table_dir, "five_card.npy")),
+            ),
+        ) as executor:
+            game = ChinesePokerGame(
+                hands, three_table, five_table, executor=executor, warm_start=not args.random_start
+            )
+    else:
+        game = ChinesePokerGame(hands, three_table, five_table, warm_start=not args.random_start)
     init_time = time.perf_counter() - game_start
 
     equilibrium_start = time.perf_counter()
@@ -18,30 +18,13 @@ Dependencies:
 
 from typing import List, Tuple, Dict, Any
 
+import numpy as np
+
 from arrange_with_stats import HandStats, find_arrangements_with_stats, load_dictionaries
-from poker import Card, Deck
+from poker import STR_TO_CARD, Card, Deck
 from scoring_fast import Arrangement, score_game
 
 
-def parse_card_str(card_str: str) -> Tuple[str, str]:
-    """Parse a card string into rank and suit, handling '10' as a special case.
-
-    Args:
-        card_str: A string representing a card (e.g., 'AS', '10D').
-
-    Returns:
-        A tuple of (rank, suit).
-
-    Raises:
-        ValueError: If the card string format is invalid.
-    """
-    if len(card_str) < 2:
-        raise ValueError(f"Invalid card format: {card_str}")
-    if len(card_str) > 2:  # Handle '10x'
-        return card_str[:-1], card_str[-1]
-    return card_str[0], card_str[1]
-
-
 def create_arrangement(arrangement_info: Dict[str, Any]) -> Arrangement:
     """Convert an arrangement info dictionary to an Arrangement object.
 
@@ -52,9 +35,9 @@ def create_arrangement(arrangement_info: Dict[str, Any]) -> Arrangement:
     Returns:
         An Arrangement object with card lists and evaluation scores.
     """
-    front = [Card(*parse_card_str(c)) for c in arrangement_info["front_cards"].split()]
-    middle = [Card(*parse_card_str(c)) for c in arrangement_info["middle_cards"].split()]
-    back = [Card(*parse_card_str(c)) for c in arrangement_info["back_cards"].split()]
+    front = [STR_TO_CARD[c] for c in arrangement_info["front_cards"].split()]
+    middle = [STR_TO_CARD[c] for c in arrangement_info["middle_cards"].split()]
+    back = [STR_TO_CARD[c] for c in arrangement_info["back_cards"].split()]
     return Arrangement(
         front=front,
         middle=middle,
@@ -66,21 +49,21 @@ def create_arrangement(arrangement_info: Dict[str, Any]) -> Arrangement:
 
 
 def find_best_arrangement(
-    hand: List[Card], three_dict: Dict, five_dict: Dict, stats: HandStats
+    hand: List[Card], three_table: np.ndarray, five_table: np.ndarray, stats: HandStats
 ) -> Tuple[Dict[str, Any], Arrangement]:
     """Find the arrangement with the highest expected value for a hand.
 
     Args:
         hand: List of 13 Card objects.
-        three_dict: Dictionary mapping 3-card combinations to scores.
-        five_dict: Dictionary mapping 5-card combinations to scores.
+        three_table: 3-card scores indexed by combination_rank.
+        five_table: 5-card scores indexed by combination_rank.
         stats: HandStats object for statistical calculations.
 
     Returns:
         A tuple of (best arrangement info dictionary, corresponding Arrangement object).
     """
-    arrangements = find_arrangements_with_stats(hand, three_dict, five_dict, stats)
-    best_info = max(arrangements, key=lambda x: x["expected_value"])
+    # Arrangements come back ranked by expected value; only the best is needed
+    best_info = find_arrangements_with_stats(hand, three_table, five_table, stats, limit=1)[0]
     return best_info, create_arrangement(best_info)
 
 
@@ -129,7 +112,7 @@ def format_ev_breakdown(info: Dict[str, Any]) -> str:
 def main() -> None:
     """Main function to simulate and display a 4-player Chinese Poker game."""
     print("Loading dictionaries...")
-    three_dict, five_dict = load_dictionaries("Dict/three_card.pkl", "Dict/five_card.pkl")
+    three_table, five_table = load_dictionaries("Dict/three_card.pkl", "Dict/five_card.pkl")
     stats = HandStats()
 
     print("\nDealing hands...")
@@ -142,7 +125,7 @@ def main() -> None:
     for i, hand in enumerate(hands, 1):
         print(f"\nPlayer {i}")
         print(f"Hand: {format_hand(hand)}")
-        best_info, best_arr = find_best_arrangement(hand, three_dict, five_dict, stats)
+        best_info, best_arr = find_best_arrangement(hand, three_table, five_table, stats)
         players_arrangements.append(best_arr)
         print("Best arrangement:")
         print(str(best_arr))
@@ -11,6 +11,8 @@ Features:
   • Hand evaluation for 3–card hands (only three-of-a-kind, pair, high-card)
   • A system to generate all possible 3–card or 5–card combinations from
     a 52–card deck, evaluate (score) them, and save the mapping to file.
+    Generation scores packed integer card codes (a rank prime and a suit
+    bit per card) through prime-product lookup tables.
   • Optionally save the generated combinations to a CSV file for verification.
 
 Usage:
@@ -22,34 +24,56 @@ Usage:
           python poker.py --generate 3 --outfile three_card.pkl [--csv three_card.csv]
       5–card hands:
           python poker.py --generate 5 --outfile five_card.pkl [--csv five_card.csv]
+      The dense .npy score table is saved next to the pickle; pass an
+      --outfile ending in .npy to save only the table.
 """
 
 import random
 import itertools
 import collections
+import os
 import pickle
 import argparse
 import csv
-from typing import List, Tuple, Dict, Optional
+import multiprocessing
+from math import comb
+from typing import List, Tuple, Dict, Optional, Sequence
+
+import numpy as np
 
 # Global definitions for card ranks and suits
 RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
 RANK_VALUES = {rank: i for i, rank in enumerate(RANKS, start=2)}
 SUITS = ["C", "D", "H", "S"]  # Clubs, Diamonds, Hearts, Spades
+RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+# One bit per suit at bits 16–19, as in the packed card codes of encode_card
+SUIT_BITS = {suit: 1 << (16 + i) for i, suit in enumerate(SUITS)}
 
 
 class Card:
     """A playing card with a rank, suit, and numerical value."""
 
+    __slots__ = ("rank", "suit", "value")
+
     def __init__(self, rank: str, suit: str) -> None:
-        if rank not in RANKS:
+        if rank not in RANK_VALUES:
             raise ValueError(f"Invalid rank: {rank}")
-        if suit not in SUITS:
+        if suit not in SUIT_INDEX:
             raise ValueError(f"Invalid suit: {suit}")
         self.rank = rank
         self.suit = suit
         self.value = RANK_VALUES[rank]
 
+    @classmethod
+    def _fast(cls, rank: str, suit: str) -> "Card":
+        """Create a card from a rank and suit known to be valid, skipping validation."""
+        card = object.__new__(cls)
+        card.rank = rank
+        card.suit = suit
+        card.value = RANK_VALUES[rank]
+        return card
+
     def __repr__(self) -> str:
         return f"{self.rank}{self.suit}"
 
@@ -63,13 +87,28 @@ class Card:
 
 
 class Deck:
-    """A deck of 52 playing cards."""
+    """
+    A deck of 52 playing cards.
+
+    The deck order is kept as an int8 array of card IDs, and the cards dealt
+    are the shared CARDS_BY_ID objects.
+    Shuffling uses the random module, so seeded runs are reproducible, unless
+    a NumPy Generator is passed in as rng.
+    """
 
-    def __init__(self) -> None:
-        self.cards: List[Card] = [Card(rank, suit) for suit in SUITS for rank in RANKS]
+    def __init__(self, rng: Optional[np.random.Generator] = None) -> None:
+        self._rng = rng
+        self.ids = np.arange(len(CARDS_BY_ID), dtype=np.int8)
+        self.cards: List[Card] = list(CARDS_BY_ID)
 
     def shuffle(self) -> None:
-        random.shuffle(self.cards)
+        if self._rng is None:
+            order = self.ids.tolist()
+            random.shuffle(order)
+            self.ids = np.array(order, dtype=np.int8)
+        else:
+            self.ids = self._rng.permutation(len(self.ids)).astype(np.int8)
+        self.cards = [CARDS_BY_ID[card_id] for card_id in self.ids.tolist()]
 
     def deal(self, num_players: int, cards_each: int = 13) -> List[List[Card]]:
         """
@@ -101,13 +140,25 @@ def is_straight(values: List[int]) -> Tuple[bool, Optional[int]]:
     return False, None
 
 
+# 13-bit rank presence mask (bit v - 2 for value v) of each straight -> its
+# high card; the wheel A-2-3-4-5 plays as 5 high
+STRAIGHT_MASKS: Dict[int, int] = {
+    sum(1 << (v - 2) for v in range(low, low + 5)): low + 4 for low in range(2, 11)
+}
+STRAIGHT_MASKS[0b1000000001111] = 5
+
+
 def tuple_to_decimal(category: int, tiebreakers: Tuple[int, ...]) -> float:
     """Convert a category and tiebreaker tuple to a decimal score."""
     if not tiebreakers:
         return float(category)
-    # Convert tiebreakers to string, pad each number to 2 digits
-    decimal_part = "".join(str(x).zfill(2) for x in tiebreakers)
-    return float(f"{category}.{decimal_part}")
+    # Append each tiebreaker as two decimal digits to an integer, then shift
+    # the point with one division; int / int is correctly rounded, so this
+    # equals parsing the "category.t0t1..." string
+    digits = category
+    for x in tiebreakers:
+        digits = digits * 100 + x
+    return digits / 100 ** len(tiebreakers)
 
 
 def evaluate_five(cards: List[Card]) -> float:
@@ -128,50 +179,56 @@ def evaluate_five(cards: List[Card]) -> float:
        2: Pair
        1: High Card
     """
+    # Sort the values once; rank lists below are read off in descending order
     values = sorted([card.value for card in cards])
-    counts = collections.Counter(card.value for card in cards)
-    count_vals = sorted(counts.values(), reverse=True)
-    is_flush = len({card.suit for card in cards}) == 1
-    straight, high_straight = is_straight(sorted(values))
+    desc = values[::-1]
+    # Rank histogram: hist[v - 2] is the number of cards of value v
+    hist = [0] * len(RANKS)
+    for v in values:
+        hist[v - 2] += 1
+    # A flush leaves its suit bit set when the five suit bits are ANDed together
+    c0, c1, c2, c3, c4 = cards
+    is_flush = (
+        SUIT_BITS[c0.suit] & SUIT_BITS[c1.suit] & SUIT_BITS[c2.suit]
+        & SUIT_BITS[c3.suit] & SUIT_BITS[c4.suit]
+    ) != 0
+    # Five distinct ranks form a straight when their mask is a straight mask
+    high_straight = None
+    if hist.count(1) == 5:
+        high_straight = STRAIGHT_MASKS.get(sum(1 << (v - 2) for v in values))
+    straight = high_straight is not None
 
     if is_flush and straight:
-        if high_straight == 14 and min(values) == 10:
+        if high_straight == 14 and values[0] == 10:
             return tuple_to_decimal(10, ())
         else:
             return tuple_to_decimal(9, (high_straight,))
-    if 4 in count_vals:
-        quad = max(rank for rank, cnt in counts.items() if cnt == 4)
-        kicker = max(rank for rank, cnt in counts.items() if cnt == 1)
+    if 4 in hist:
+        quad = next(v for v in desc if hist[v - 2] == 4)
+        kicker = next(v for v in desc if hist[v - 2] == 1)
         return tuple_to_decimal(8, (quad, kicker))
-    if 3 in count_vals and 2 in count_vals:
-        triple = max(rank for rank, cnt in counts.items() if cnt == 3)
-        pair = max(rank for rank, cnt in counts.items() if cnt == 2)
+    if 3 in hist and 2 in hist:
+        triple = next(v for v in desc if hist[v - 2] == 3)
+        pair = next(v for v in desc if hist[v - 2] == 2)
         return tuple_to_decimal(7, (triple, pair))
     if is_flush:
-        sorted_desc = tuple(sorted((card.value for card in cards), reverse=True))
-        return tuple_to_decimal(6, sorted_desc)
+        return tuple_to_decimal(6, tuple(desc))
     if straight:
         return tuple_to_decimal(5, (high_straight,))
-    if 3 in count_vals:
-        triple = max(rank for rank, cnt in counts.items() if cnt == 3)
-        kickers = tuple(
-            sorted((rank for rank, cnt in counts.items() if cnt == 1), reverse=True)
-        )
+    if 3 in hist:
+        triple = next(v for v in desc if hist[v - 2] == 3)
+        kickers = tuple(v for v in desc if hist[v - 2] == 1)
         return tuple_to_decimal(4, (triple,) + kickers)
-    if count_vals.count(2) == 2:
-        pairs = tuple(
-            sorted((rank for rank, cnt in counts.items() if cnt == 2), reverse=True)
-        )
-        kicker = max(rank for rank, cnt in counts.items() if cnt == 1)
+    if hist.count(2) == 2:
+        # Each pair appears twice in desc
+        pairs = tuple(v for v in desc if hist[v - 2] == 2)[::2]
+        kicker = next(v for v in desc if hist[v - 2] == 1)
         return tuple_to_decimal(3, pairs + (kicker,))
-    if 2 in count_vals:
-        pair = max(rank for rank, cnt in counts.items() if cnt == 2)
-        kickers = tuple(
-            sorted((rank for rank, cnt in counts.items() if cnt == 1), reverse=True)
-        )
+    if 2 in hist:
+        pair = next(v for v in desc if hist[v - 2] == 2)
+        kickers = tuple(v for v in desc if hist[v - 2] == 1)
         return tuple_to_decimal(2, (pair,) + kickers)
-    sorted_desc = tuple(sorted((card.value for card in cards), reverse=True))
-    return tuple_to_decimal(1, sorted_desc)
+    return tuple_to_decimal(1, tuple(desc))
 
 
 def evaluate_three(cards: List[Card]) -> float:
@@ -185,30 +242,34 @@ def evaluate_three(cards: List[Card]) -> float:
        2: Pair
        1: High Card
     """
-    counts = collections.Counter(card.value for card in cards)
-    count_vals = sorted(counts.values(), reverse=True)
-    if 3 in count_vals:
-        triple = max(rank for rank, cnt in counts.items() if cnt == 3)
-        return tuple_to_decimal(4, (triple,))
-    if 2 in count_vals:
-        pair = max(rank for rank, cnt in counts.items() if cnt == 2)
-        kicker = max(rank for rank, cnt in counts.items() if cnt == 1)
+    desc = sorted([card.value for card in cards], reverse=True)
+    # Rank histogram: hist[v - 2] is the number of cards of value v
+    hist = [0] * len(RANKS)
+    for v in desc:
+        hist[v - 2] += 1
+    if 3 in hist:
+        return tuple_to_decimal(4, (desc[0],))
+    if 2 in hist:
+        pair = next(v for v in desc if hist[v - 2] == 2)
+        kicker = next(v for v in desc if hist[v - 2] == 1)
         return tuple_to_decimal(2, (pair, kicker))
-    sorted_desc = tuple(sorted((card.value for card in cards), reverse=True))
-    return tuple_to_decimal(1, sorted_desc)
+    return tuple_to_decimal(1, tuple(desc))
 
 
 def evaluate_hand(cards: List[Card]) -> float:
     """
     Evaluate a hand (list of Card objects). Must be either 3 or 5 cards.
     Returns a decimal number.
+    The score is looked up through evaluate_codes; hands missing from its
+    tables (only possible with repeated cards) are scored by evaluate_five
+    or evaluate_three directly.
     """
-    if len(cards) == 5:
-        return evaluate_five(cards)
-    elif len(cards) == 3:
-        return evaluate_three(cards)
-    else:
+    if len(cards) not in (3, 5):
         raise ValueError("Hand must contain either 3 or 5 cards")
+    try:
+        return evaluate_codes([encode_card(card) for card in cards])
+    except KeyError:
+        return evaluate_five(cards) if len(cards) == 5 else evaluate_three(cards)
 
 
 def compare_hands(hand1: List[Card], hand2: List[Card]) -> int:
@@ -225,6 +286,81 @@ def compare_hands(hand1: List[Card], hand2: List[Card]) -> int:
         return 0
 
 
+# -------------------- Packed Integer Evaluation --------------------
+
+# One prime per rank (2 through A). The product of a hand's primes depends
+# only on its ranks, and identifies their multiset uniquely.
+RANK_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+
+def encode_card(card: Card) -> int:
+    """
+    Pack a card into an int: its rank prime in the low byte and one bit per
+    suit at bits 16–19, so a hand is a flush when all its codes share a suit bit.
+    """
+    return SUIT_BITS[card.suit] | RANK_PRIMES[card.value - 2]
+
+
+_PRIME_TABLES: Optional[Tuple[Dict[int, float], Dict[int, float], Dict[int, float]]] = None
+
+
+def prime_tables() -> Tuple[Dict[int, float], Dict[int, float], Dict[int, float]]:
+    """
+    Build (once) the lookup tables from a hand's rank prime product to its score:
+    5–card flushes, 5–card non-flushes and 3–card hands. Each entry is scored
+    by evaluate_five / evaluate_three on a representative hand.
+    """
+    global _PRIME_TABLES
+    if _PRIME_TABLES is None:
+        flush_lookup: Dict[int, float] = {}
+        unsuited_lookup: Dict[int, float] = {}
+        three_lookup: Dict[int, float] = {}
+        for n, lookup in ((5, unsuited_lookup), (3, three_lookup)):
+            for ranks in itertools.combinations_with_replacement(range(len(RANKS)), n):
+                counts = collections.Counter(ranks)
+                if max(counts.values()) > len(SUITS):
+                    continue
+                product = 1
+                for r in ranks:
+                    product *= RANK_PRIMES[r]
+                if len(counts) == n:
+                    # Distinct ranks: rotate the suits so the hand is no flush
+                    suits = [i % len(SUITS) for i in range(n)]
+                    if n == 5:
+                        flush_lookup[product] = evaluate_five([Card._fast(RANKS[r], SUITS[0]) for r in ranks])
+                else:
+                    # Repeated ranks: give each copy of a rank its own suit
+                    seen: Dict[int, int] = collections.Counter()
+                    suits = []
+                    for r in ranks:
+                        suits.append(seen[r])
+                        seen[r] += 1
+                hand = [Card._fast(RANKS[r], SUITS[s]) for r, s in zip(ranks, suits)]
+                lookup[product] = evaluate_five(hand) if n == 5 else evaluate_three(hand)
+        _PRIME_TABLES = (flush_lookup, unsuited_lookup, three_lookup)
+    return _PRIME_TABLES
+
+
+def evaluate_codes(codes: Sequence[int]) -> float:
+    """
+    Evaluate a 3– or 5–card hand of packed card codes (see encode_card).
+    Gives the same score as evaluate_hand with a few bit operations and one
+    table lookup.
+    """
+    flush_lookup, unsuited_lookup, three_lookup = prime_tables()
+    if len(codes) == 5:
+        c1, c2, c3, c4, c5 = codes
+        product = (c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)
+        if c1 & c2 & c3 & c4 & c5 & 0xF0000:
+            return flush_lookup[product]
+        return unsuited_lookup[product]
+    elif len(codes) == 3:
+        c1, c2, c3 = codes
+        return three_lookup[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF)]
+    else:
+        raise ValueError("Hand must contain either 3 or 5 cards")
+
+
 # -------------------- Combination Dictionary Generation --------------------
 
 
@@ -232,9 +368,7 @@ def card_to_id(card: Card) -> int:
     """
     Convert a card to a unique ID (0 to 51) based on SUITS and RANKS order.
     """
-    suit_index = SUITS.index(card.suit)
-    rank_index = RANKS.index(card.rank)
-    return suit_index * len(RANKS) + rank_index
+    return SUIT_INDEX[card.suit] * len(RANKS) + RANK_INDEX[card.rank]
 
 
 def id_to_card(card_id: int) -> str:
@@ -247,60 +381,248 @@ def id_to_card(card_id: int) -> str:
     return f"{RANKS[rank_index]}{SUITS[suit_index]}"
 
 
-def generate_combinations_dict(n: int) -> Dict[Tuple[int, ...], float]:
+# Lookup tables from card IDs to cards, and from card strings (e.g. "10D") to
+# cards and card IDs
+CARDS_BY_ID: List[Card] = [Card._fast(rank, suit) for suit in SUITS for rank in RANKS]
+CODES_BY_ID: List[int] = [encode_card(card) for card in CARDS_BY_ID]
+CODES_ARRAY = np.array(CODES_BY_ID, dtype=np.int64)
+STR_TO_CARD: Dict[str, Card] = {str(card): card for card in CARDS_BY_ID}
+STR_TO_ID: Dict[str, int] = {card_str: card_to_id(card) for card_str, card in STR_TO_CARD.items()}
+ID_TO_STR: Tuple[str, ...] = tuple(str(card) for card in CARDS_BY_ID)
+
+
+# Buffer size for reading and writing pickled dictionaries, so the
+# multi-megabyte 5–card pickle is streamed in large reads
+PICKLE_BUFFER_SIZE = 1 << 20
+
+
+# File buffer size and rows per writerows call for save_combinations_csv
+CSV_BUFFER_SIZE = 1 << 20
+CSV_BATCH_ROWS = 10000
+
+
+# Binomial coefficients C(c, k) for c < 52 and k <= 5, used to rank card subsets
+BINOMIAL = np.array([[comb(c, k) for k in range(6)] for c in range(52)], dtype=np.int64)
+
+
+def combination_rank(ids: Sequence[int]) -> int:
+    """
+    Rank a sorted sequence of card IDs in the combinatorial number system.
+    Every r–card subset of the deck maps to a unique index in [0, C(52, r)),
+    which is used as a perfect hash into a dense score table.
+    """
+    return sum(comb(card_id, k) for k, card_id in enumerate(ids, start=1))
+
+
+def combination_ranks(ids: np.ndarray) -> np.ndarray:
+    """
+    Vectorized combination_rank over the rows of an (m, r) array of sorted card IDs.
+    """
+    return BINOMIAL[ids, np.arange(1, ids.shape[-1] + 1)].sum(axis=-1)
+
+
+def build_score_table(comb_dict: Dict[Tuple[int, ...], float], n: int) -> np.ndarray:
+    """
+    Convert an n–card combination dictionary into a dense score table indexed
+    by combination_rank. Combinations missing from the dictionary are NaN.
+    """
+    table = np.full(comb(len(SUITS) * len(RANKS), n), np.nan)
+    if comb_dict:
+        keys = np.array(list(comb_dict.keys()), dtype=np.int64)
+        table[combination_ranks(keys)] = np.fromiter(comb_dict.values(), dtype=np.float64, count=len(comb_dict))
+    return table
+
+
+def load_score_table(filename: str, n: int) -> np.ndarray:
+    """
+    Load the n–card score table for a dictionary file. A '.npy' table, either
+    given directly or saved next to the pickle with the same stem, is memory
+    mapped; otherwise the pickled dictionary is loaded and converted.
+    """
+    stem, ext = os.path.splitext(filename)
+    npy_file = filename if ext == ".npy" else stem + ".npy"
+    if os.path.exists(npy_file):
+        return np.load(npy_file, mmap_mode="r")
+    with open(filename, "rb", buffering=PICKLE_BUFFER_SIZE) as f:
+        return build_score_table(pickle.load(f), n)
+
+
+def score_table_file(table: np.ndarray, filename: str) -> str:
+    """
+    Return a '.npy' file other processes can memory-map the score table from:
+    the file the table is already mapped from, or filename after saving the
+    table there. Processes mapping one file share its pages instead of each
+    unpickling a copy.
+    """
+    if isinstance(table, np.memmap) and table.filename:
+        return table.filename
+    np.save(filename, table)
+    return filename
+
+
+def convert_combinations_dict(filename: str) -> None:
+    """
+    Convert a pickled combination dictionary into a '.npy' score table saved
+    next to it, so later runs can memory-map it instead of unpickling.
+    """
+    with open(filename, "rb", buffering=PICKLE_BUFFER_SIZE) as f:
+        comb_dict = pickle.load(f)
+    n = len(next(iter(comb_dict)))
+    npy_file = os.path.splitext(filename)[0] + ".npy"
+    np.save(npy_file, build_score_table(comb_dict, n))
+    print(f"Saved {n}–card score table to {npy_file}")
+
+
+def _lookup_products(table: Dict[int, float], products: np.ndarray) -> np.ndarray:
+    """
+    Look up an array of rank prime products in a prime_tables table through
+    its sorted keys.
+    """
+    keys = np.array(sorted(table), dtype=np.int64)
+    scores = np.array([table[key] for key in keys.tolist()], dtype=np.float64)
+    return scores[np.searchsorted(keys, products)]
+
+
+def evaluate_codes_batch(codes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized evaluate_codes over the rows of an (m, 3) or (m, 5) int64 array
+    of packed card codes.
+    """
+    flush_lookup, unsuited_lookup, three_lookup = prime_tables()
+    products = np.prod(codes & 0xFF, axis=1)
+    if codes.shape[1] == 3:
+        return _lookup_products(three_lookup, products)
+    # Flushes have distinct ranks, so every product is also an unsuited key
+    scores = _lookup_products(unsuited_lookup, products)
+    is_flush = (np.bitwise_and.reduce(codes, axis=1) & 0xF0000) != 0
+    scores[is_flush] = _lookup_products(flush_lookup, products[is_flush])
+    return scores
+
+
+def evaluate_ids(ids: Sequence[int]) -> float:
+    """
+    Evaluate a 3– or 5–card hand given as card IDs (0 to 51), as evaluate_hand
+    does for the corresponding cards.
+    """
+    return evaluate_codes([CODES_BY_ID[card_id] for card_id in ids])
+
+
+def evaluate_ids_batch(ids: np.ndarray) -> np.ndarray:
+    """
+    Vectorized evaluate_ids over the rows of an (m, 3) or (m, 5) array of card IDs.
+    """
+    return evaluate_codes_batch(CODES_ARRAY[ids])
+
+
+def _score_shard(shard: Tuple[int, int]) -> np.ndarray:
+    """
+    Score the n–card combinations whose lowest card ID is first, in
+    itertools.combinations order. Runs in generate_combinations_dict's workers.
+    """
+    n, first = shard
+    rest = list(itertools.combinations(range(first + 1, len(CODES_BY_ID)), n - 1))
+    ids = np.empty((len(rest), n), dtype=np.int64)
+    ids[:, 0] = first
+    if rest:
+        ids[:, 1:] = rest
+    return evaluate_ids_batch(ids)
+
+
+def generate_combinations_dict(
+    n: int, batch_size: int = 100000, workers: int = 0
+) -> Dict[Tuple[int, ...], float]:
     """
     Generate a dictionary mapping every n–card combination (as a sorted tuple of card IDs)
     to its evaluation score.
     The keys are sorted tuples of card IDs (integers from 0 to 51) to ensure uniqueness.
+    Combinations are scored batch_size at a time with evaluate_ids_batch, or,
+    with workers > 0, in one shard per lowest card on a process pool; shards
+    come back in order, so the dictionary is the same either way.
     """
-    deck: List[Card] = [Card(rank, suit) for suit in SUITS for rank in RANKS]
     comb_dict: Dict[Tuple[int, ...], float] = {}
     total = {3: 22100, 5: 2598960}[n]
     count = 0
-    for combo in itertools.combinations(deck, n):
-        key = tuple(sorted(card_to_id(card) for card in combo))
-        score = evaluate_hand(combo)
-        comb_dict[key] = score
-        count += 1
-        if count % 100000 == 0:
-            print(f"Processed {count}/{total} combinations...")
+    num_cards = len(CODES_BY_ID)
+    if workers > 0:
+        with multiprocessing.Pool(workers) as pool:
+            shards = pool.imap(_score_shard, [(n, first) for first in range(num_cards)])
+            for first, scores in enumerate(shards):
+                keys = ((first,) + rest for rest in itertools.combinations(range(first + 1, num_cards), n - 1))
+                comb_dict.update(zip(keys, scores.tolist()))
+                count += len(scores)
+                print(f"Processed {count}/{total} combinations...")
+        return comb_dict
+
+    # Combinations of the IDs in order are already sorted tuples of card IDs
+    combos = itertools.combinations(range(num_cards), n)
+    while count < total:
+        keys = list(itertools.islice(combos, batch_size))
+        scores = evaluate_ids_batch(np.array(keys, dtype=np.int64))
+        comb_dict.update(zip(keys, scores.tolist()))
+        count += len(keys)
+        print(f"Processed {count}/{total} combinations...")
     return comb_dict
 
 
-def save_combinations_dict(n: int, filename: str) -> None:
+def generate_score_table(n: int) -> np.ndarray:
+    """
+    Generate the dense n–card score table indexed by combination_rank directly,
+    scoring every combination in one batch without building the dictionary.
     """
-    Generate and save the n–card combination dictionary to a pickle file.
+    num_cards = len(CODES_BY_ID)
+    total = comb(num_cards, n)
+    ids = np.fromiter(
+        itertools.chain.from_iterable(itertools.combinations(range(num_cards), n)),
+        dtype=np.int64,
+        count=total * n,
+    ).reshape(total, n)
+    table = np.empty(total, dtype=np.float64)
+    table[combination_ranks(ids)] = evaluate_ids_batch(ids)
+    return table
+
+
+def save_combinations_dict(n: int, filename: str, workers: int = 0) -> None:
     """
+    Generate and save the n–card combination dictionary to a pickle file, and
+    its dense score table to a '.npy' file next to it that later runs
+    memory-map instead of unpickling. With a '.npy' filename only the score
+    table is generated and saved. workers is passed to generate_combinations_dict.
+    """
+    stem, ext = os.path.splitext(filename)
+    if ext == ".npy":
+        print(f"Generating score table for {n}–card combinations...")
+        np.save(filename, generate_score_table(n))
+        print(f"Saved {n}–card score table to {filename}")
+        return
     print(f"Generating dictionary for {n}–card combinations...")
-    comb_dict = generate_combinations_dict(n)
-    with open(filename, "wb") as f:
-        pickle.dump(comb_dict, f)
+    comb_dict = generate_combinations_dict(n, workers=workers)
+    with open(filename, "wb", buffering=PICKLE_BUFFER_SIZE) as f:
+        pickle.dump(comb_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
     print(f"Saved {len(comb_dict)} combinations to {filename}")
+    np.save(stem + ".npy", build_score_table(comb_dict, n))
+    print(f"Saved {n}–card score table to {stem}.npy")
 
 
-def save_combinations_csv(n: int, filename: str) -> None:
+def save_combinations_csv(n: int, filename: str, workers: int = 0) -> None:
     """
     Generate and save the n–card combination dictionary to a CSV file.
     The CSV will have columns: combination, score.
     """
     print(f"Generating CSV for {n}–card combinations...")
-    deck: List[Card] = [Card(rank, suit) for suit in SUITS for rank in RANKS]
-    total = {3: 22100, 5: 2598960}[n]
-    count = 0
-    with open(filename, "w", newline="") as csvfile:
+    comb_dict = generate_combinations_dict(n, workers=workers)
+    with open(filename, "w", newline="", buffering=CSV_BUFFER_SIZE) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(["combination", "score"])
-        for combo in itertools.combinations(deck, n):
-            key_ids = tuple(sorted(card_to_id(card) for card in combo))
-            score = evaluate_hand(combo)
-            # Convert the sorted IDs into a human-readable string of cards
-            combo_cards = [id_to_card(cid) for cid in key_ids]
-            combo_str = " ".join(combo_cards)
-            writer.writerow([combo_str, score])
-            count += 1
-            if count % 100000 == 0:
-                print(f"Processed {count}/{total} combinations...")
-    print(f"Saved CSV for {count} combinations to {filename}")
+        # Rows are handed to the writer in batches; card strings come from
+        # ID_TO_STR
+        rows = []
+        for key_ids, score in comb_dict.items():
+            rows.append([" ".join([ID_TO_STR[cid] for cid in key_ids]), score])
+            if len(rows) == CSV_BATCH_ROWS:
+                writer.writerows(rows)
+                rows.clear()
+        writer.writerows(rows)
+    print(f"Saved CSV for {len(comb_dict)} combinations to {filename}")
 
 
 # -------------------- Demo / Main --------------------
@@ -343,6 +665,18 @@ def main() -> None:
         "--csv",
         help="Also save the combinations to this CSV file for verification.",
     )
+    parser.add_argument(
+        "--convert",
+        nargs="+",
+        metavar="PKL",
+        help="Convert pickled dictionaries into .npy score tables saved alongside them.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processes to score combinations with in --generate (0 to score in this process).",
+    )
 
     args = parser.parse_args()
 
@@ -353,9 +687,12 @@ def main() -> None:
     elif args.generate:
         if not args.outfile:
             parser.error("--outfile is required with --generate")
-        save_combinations_dict(args.generate, args.outfile)
+        save_combinations_dict(args.generate, args.outfile, args.workers)
         if args.csv:
-            save_combinations_csv(args.generate, args.csv)
+            save_combinations_csv(args.generate, args.csv, args.workers)
+    elif args.convert:
+        for filename in args.convert:
+            convert_combinations_dict(filename)
 
 
 if __name__ == "__main__":
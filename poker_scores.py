@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+poker_scores.py
+
+Per-hand subset scoring shared by arrange.py and arrange_with_stats.py.
+
+A 13-card hand sorted by card ID has 286 possible fronts (3 cards) and
+1287 five-card subsets. The index tables below enumerate them once at
+import, together with every middle/back split of the 10 cards left by
+each front, so the arrangement searches reduce to array lookups:
+    - score_subsets scores every 3-card and 5-card subset of a hand
+    - subset_strings joins the card strings of every subset
+"""
+
+import itertools
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from poker import combination_ranks
+
+# Index tables for splitting a sorted 13-card hand, built once at import:
+#   FRONT_IDX  (286, 3)  - hand positions of every possible front
+#   REST_IDX   (286, 10) - the 10 positions left over by each front
+#   MID_OF_10  (252, 5)  - middle picks, as offsets into a REST_IDX row
+#   BACK_OF_10 (252, 5)  - the complementary back picks
+#   FIVE_IDX   (1287, 5) - hand positions of every 5-card subset
+#   MIDDLE_SUB (286, 252) - row of FIVE_IDX holding each split's middle
+#   BACK_SUB   (286, 252) - row of FIVE_IDX holding each split's back
+FRONT_IDX = np.array(list(itertools.combinations(range(13), 3)), dtype=np.int8)
+REST_IDX = np.array(
+    [[i for i in range(13) if i not in front] for front in FRONT_IDX.tolist()], dtype=np.int8
+)
+MID_OF_10 = np.array(list(itertools.combinations(range(10), 5)), dtype=np.int8)
+BACK_OF_10 = np.array(
+    [[i for i in range(10) if i not in middle] for middle in MID_OF_10.tolist()], dtype=np.int8
+)
+FIVE_IDX = np.array(list(itertools.combinations(range(13), 5)), dtype=np.int8)
+
+# Deposit each split's 5 offsets into its front's remaining positions as a
+# 13-bit hand mask (a table-driven PDEP), then map masks to FIVE_IDX rows
+_FIVE_ROW_OF_MASK = np.full(1 << 13, -1, dtype=np.int16)
+_FIVE_ROW_OF_MASK[(1 << FIVE_IDX.astype(np.int64)).sum(axis=1)] = np.arange(len(FIVE_IDX))
+_REST_BITS = 1 << REST_IDX.astype(np.int64)
+MIDDLE_SUB = _FIVE_ROW_OF_MASK[_REST_BITS[:, MID_OF_10].sum(axis=2)]
+BACK_SUB = _FIVE_ROW_OF_MASK[_REST_BITS[:, BACK_OF_10].sum(axis=2)]
+
+
+def score_subsets(
+    hand_ids: np.ndarray,
+    three_table: np.ndarray,
+    five_table: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score every 3-card and 5-card subset of a hand with a single gather.
+
+    Args:
+        hand_ids: The 13 card IDs of the hand, sorted ascending.
+        three_table: 3-card scores indexed by combination_rank.
+        five_table: 5-card scores indexed by combination_rank.
+
+    Returns:
+        Scores of the subsets in FRONT_IDX and FIVE_IDX order (NaN if missing).
+    """
+    return (
+        three_table[combination_ranks(hand_ids[FRONT_IDX])],
+        five_table[combination_ranks(hand_ids[FIVE_IDX])],
+    )
+
+
+def subset_strings(card_strs: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """
+    Join the card strings of every 3-card and 5-card subset of a hand.
+
+    Args:
+        card_strs: The 13 card strings of the hand, in sorted card ID order.
+
+    Returns:
+        Space-separated subset strings in FRONT_IDX and FIVE_IDX order.
+    """
+    front_strs = [" ".join([card_strs[i] for i in row]) for row in FRONT_IDX.tolist()]
+    five_strs = [" ".join([card_strs[i] for i in row]) for row in FIVE_IDX.tolist()]
+    return front_strs, five_strs
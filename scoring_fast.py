@@ -15,14 +15,16 @@ This module:
 - Supports a 4-player game simulation with performance benchmarking.
 """
 
-import pickle
 import random
 import timeit
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
+from typing import List, Optional, Sequence, Tuple
 
-from arrange import find_valid_arrangements as calc_find_arrangements
-from poker import Card, Deck
+import numpy as np
+
+from arrange import find_valid_splits
+from poker import STR_TO_CARD, Card, Deck, load_score_table
+from poker_scores import FIVE_IDX, FRONT_IDX
 
 
 @dataclass
@@ -36,9 +38,14 @@ class Arrangement:
         front_eval: Evaluation score for the front hand.
         middle_eval: Evaluation score for the middle hand.
         back_eval: Evaluation score for the back hand.
+        front_cat: Category (integer part of the score) of the front hand.
+        middle_cat: Category of the middle hand.
+        back_cat: Category of the back hand.
     """
 
-    __slots__ = ["front", "middle", "back", "front_eval", "middle_eval", "back_eval"]
+    __slots__ = [
+        "front", "middle", "back", "front_eval", "middle_eval", "back_eval", "front_cat", "middle_cat", "back_cat"
+    ]
     front: List[Card]
     middle: List[Card]
     back: List[Card]
@@ -46,6 +53,16 @@ class Arrangement:
     middle_eval: float
     back_eval: float
 
+    def __post_init__(self) -> None:
+        """Extract the categories once; comparisons read them for bonuses.
+
+        They are slots set here rather than dataclass fields, so the
+        constructor and repr are unchanged.
+        """
+        self.front_cat = int(self.front_eval)
+        self.middle_cat = int(self.middle_eval)
+        self.back_cat = int(self.back_eval)
+
     def __str__(self) -> str:
         """Return a string representation of the arrangement."""
         return (
@@ -55,25 +72,23 @@ class Arrangement:
         )
 
 
-def load_evaluation_dicts(three_card_file: str, five_card_file: str) -> Tuple[Dict, Dict]:
-    """Load precomputed evaluation dictionaries from pickle files.
+def load_evaluation_dicts(three_card_file: str, five_card_file: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Load precomputed evaluation dictionaries as dense score tables.
+
+    Converted '.npy' tables next to the pickle files are memory-mapped when present.
 
     Args:
         three_card_file: Path to the 3-card dictionary pickle file.
         five_card_file: Path to the 5-card dictionary pickle file.
 
     Returns:
-        A tuple of (three_card_dict, five_card_dict) containing evaluation dictionaries.
+        A tuple of (three_card_table, five_card_table) indexed by combination_rank.
     """
-    with open(three_card_file, "rb") as f:
-        three_card_dict = pickle.load(f)
-    with open(five_card_file, "rb") as f:
-        five_card_dict = pickle.load(f)
-    return three_card_dict, five_card_dict
+    return load_score_table(three_card_file, 3), load_score_table(five_card_file, 5)
 
 
 def parse_card_str(card_str: str) -> Card:
-    """Parse a card string into a Card object, handling '10' as a special case.
+    """Look up the shared Card object of a card string.
 
     Args:
         card_str: A string representing a card (e.g., 'AS', '10D').
@@ -84,39 +99,42 @@ def parse_card_str(card_str: str) -> Card:
     Raises:
         ValueError: If the card string format is invalid.
     """
-    if len(card_str) < 2:
+    try:
+        return STR_TO_CARD[card_str]
+    except KeyError:
         raise ValueError(f"Invalid card format: {card_str}")
-    if len(card_str) > 2:  # Handle '10x'
-        rank, suit = card_str[:-1], card_str[-1]
-    else:
-        rank, suit = card_str[0], card_str[1]
-    return Card(rank, suit)
 
 
 def find_valid_arrangements(
-        hand: List[Card], three_card_dict: Dict, five_card_dict: Dict
+        hand: List[Card], three_card_table: np.ndarray, five_card_table: np.ndarray
 ) -> List[Arrangement]:
-    """Find all valid arrangements of a 13-card hand using arrange.py's implementation.
+    """Find all valid arrangements of a 13-card hand using arrange.py's split search.
 
     Args:
         hand: List of 13 Card objects.
-        three_card_dict: Dictionary mapping 3-card combinations to scores.
-        five_card_dict: Dictionary mapping 5-card combinations to scores.
+        three_card_table: 3-card scores indexed by combination_rank.
+        five_card_table: 5-card scores indexed by combination_rank.
 
     Returns:
         A list of Arrangement objects representing valid hand splits.
     """
-    arrangements = calc_find_arrangements(hand, three_card_dict, five_card_dict)
+    all_cards, *splits = find_valid_splits(hand, three_card_table, five_card_table)
+    # Card lists of every subset of the hand, built once and copied into the
+    # arrangements that use them
+    front_cards = [[all_cards[i] for i in row] for row in FRONT_IDX.tolist()]
+    five_cards = [[all_cards[i] for i in row] for row in FIVE_IDX.tolist()]
     valid_arrangements = [
         Arrangement(
-            front=[parse_card_str(c) for c in arr["Front"].split()],
-            middle=[parse_card_str(c) for c in arr["Middle"].split()],
-            back=[parse_card_str(c) for c in arr["Back"].split()],
-            front_eval=arr["Front Score"],
-            middle_eval=arr["Middle Score"],
-            back_eval=arr["Back Score"],
+            front=front_cards[k][:],
+            middle=five_cards[middle_row][:],
+            back=five_cards[back_row][:],
+            front_eval=front_score,
+            middle_eval=middle_score,
+            back_eval=back_score,
+        )
+        for k, middle_row, back_row, front_score, middle_score, back_score in zip(
+            *(column.tolist() for column in splits)
         )
-        for arr in arrangements
     ]
     return valid_arrangements
 
@@ -137,13 +155,13 @@ def compare_arrangements_fast(arr1: Arrangement, arr2: Arrangement) -> Tuple[int
 
     # Front comparison
     if arr1.front_eval > arr2.front_eval:
-        scores[0] = 1 + (3 if int(arr1.front_eval) == 4 else 0)  # Three of a kind bonus
+        scores[0] = 1 + (3 if arr1.front_cat == 4 else 0)  # Three of a kind bonus
     elif arr1.front_eval < arr2.front_eval:
-        scores[0] = -1 - (3 if int(arr2.front_eval) == 4 else 0)
+        scores[0] = -1 - (3 if arr2.front_cat == 4 else 0)
     total_score += scores[0]
 
     # Middle comparison
-    category1, category2 = int(arr1.middle_eval), int(arr2.middle_eval)
+    category1, category2 = arr1.middle_cat, arr2.middle_cat
     if arr1.middle_eval > arr2.middle_eval:
         scores[1] = 1
         if category1 in (9, 10):  # Straight flush or royal flush
@@ -163,7 +181,7 @@ def compare_arrangements_fast(arr1: Arrangement, arr2: Arrangement) -> Tuple[int
     total_score += scores[1]
 
     # Back comparison
-    category1, category2 = int(arr1.back_eval), int(arr2.back_eval)
+    category1, category2 = arr1.back_cat, arr2.back_cat
     if arr1.back_eval > arr2.back_eval:
         scores[2] = 1
         if category1 in (9, 10):  # Straight flush or royal flush
@@ -187,6 +205,93 @@ def compare_arrangements_fast(arr1: Arrangement, arr2: Arrangement) -> Tuple[int
     return total_score, scores
 
 
+# Bonus points for winning a position, indexed by the winning hand's category
+# (the integer part of its score, 1 to 10)
+FRONT_BONUS = np.zeros(11, dtype=np.int64)
+FRONT_BONUS[4] = 3  # Three of a kind
+MIDDLE_BONUS = np.zeros(11, dtype=np.int64)
+MIDDLE_BONUS[7] = 2  # Full house
+MIDDLE_BONUS[8] = 4  # Four of a kind
+MIDDLE_BONUS[9:] = 5  # Straight flush or royal flush
+BACK_BONUS = np.zeros(11, dtype=np.int64)
+BACK_BONUS[8] = 4  # Four of a kind
+BACK_BONUS[9:] = 5  # Straight flush or royal flush
+POSITION_BONUS = (FRONT_BONUS, MIDDLE_BONUS, BACK_BONUS)
+
+
+def pairwise_scores(evals: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Compare every arrangement in one set against every arrangement in another.
+
+    Position results are the signs of the broadcast score differences, so a
+    whole block of pairs is scored without a Python-level loop.
+
+    Args:
+        evals: (n, 3) array of front, middle and back scores of the arrangements.
+        others: (m, 3) array of front, middle and back scores of the opponents.
+
+    Returns:
+        An (n, m) int8 array with the net score of each arrangement against each opponent.
+    """
+    evals = np.asarray(evals, dtype=np.float64)
+    others = np.asarray(others, dtype=np.float64)
+    sign = np.sign(evals[:, None, :] - others[None, :, :]).astype(np.int64)
+    categories = evals.astype(np.int64)
+    other_categories = others.astype(np.int64)
+
+    # Points per position: 1 plus the winner's bonus, signed by the result
+    points = np.empty_like(sign)
+    for k, bonus in enumerate(POSITION_BONUS):
+        points[:, :, k] = np.where(
+            sign[:, :, k] > 0,
+            bonus[categories[:, k]][:, None],
+            bonus[other_categories[:, k]][None, :],
+        )
+    total = (sign * (1 + points)).sum(axis=2)
+
+    # Sweep bonus
+    total += 3 * (sign > 0).all(axis=2)
+    total -= 3 * (sign < 0).all(axis=2)
+    return total.astype(np.int8)
+
+
+def compare_arrangements_batch(evals_a: np.ndarray, evals_b: np.ndarray) -> np.ndarray:
+    """Compare arrangements row by row, as compare_arrangements_fast does for each pair.
+
+    Args:
+        evals_a: (n, 3) array of front, middle and back scores of the first arrangements.
+        evals_b: (n, 3) array of front, middle and back scores of the second arrangements.
+
+    Returns:
+        An int64 array with the net score of each row of evals_a against the same row of evals_b.
+    """
+    sign = np.sign(evals_a - evals_b).astype(np.int64)
+    categories = evals_a.astype(np.int64)
+    other_categories = evals_b.astype(np.int64)
+
+    points = np.empty_like(sign)
+    for k, bonus in enumerate(POSITION_BONUS):
+        points[:, k] = np.where(sign[:, k] > 0, bonus[categories[:, k]], bonus[other_categories[:, k]])
+    total = (sign * (1 + points)).sum(axis=1)
+
+    # Sweep bonus
+    total += 3 * (sign > 0).all(axis=1)
+    total -= 3 * (sign < 0).all(axis=1)
+    return total
+
+
+def compare_arrangements_vec(evals: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Compare many arrangements against one, as compare_arrangements_fast does for a pair.
+
+    Args:
+        evals: (n, 3) array of front, middle and back scores of the arrangements.
+        other: Front, middle and back scores of the opposing arrangement.
+
+    Returns:
+        An int8 array with the net score of each arrangement against the other.
+    """
+    return pairwise_scores(evals, np.asarray(other, dtype=np.float64).reshape(1, 3))[:, 0]
+
+
 def calculate_overall_bonus_fast(arrangements: List[Arrangement]) -> List[int]:
     """Calculate the overall bonus for players with the best hands in all positions.
 
@@ -196,25 +301,69 @@ def calculate_overall_bonus_fast(arrangements: List[Arrangement]) -> List[int]:
     Returns:
         A list of bonus scores (+18 for the winner, -6 for others, or 0 if no winner).
     """
-    n_players = len(arrangements)
-    bonus_scores = [0] * n_players
-
-    for i, arr_i in enumerate(arrangements):
-        has_best = all(
-            arr_i.front_eval > arr_j.front_eval
-            and arr_i.middle_eval > arr_j.middle_eval
-            and arr_i.back_eval > arr_j.back_eval
-            for j, arr_j in enumerate(arrangements)
-            if i != j
-        )
-        if has_best:
-            bonus_scores[i] = 18
-            for j in range(n_players):
-                if j != i:
-                    bonus_scores[j] = -6
-            break
+    return calculate_overall_bonus_rows(
+        [(arr.front_eval, arr.middle_eval, arr.back_eval) for arr in arrangements]
+    )
+
 
-    return bonus_scores
+def calculate_overall_bonus_rows(rows: Sequence[Sequence[float]]) -> List[int]:
+    """Calculate the overall bonus from each player's front, middle and back scores.
+
+    Args:
+        rows: (front_eval, middle_eval, back_eval) of every player's arrangement.
+
+    Returns:
+        A list of bonus scores (+18 for the winner, -6 for others, or 0 if no winner).
+    """
+    n_players = len(rows)
+    if not n_players:
+        return []
+
+    # Only the player with the highest front can beat everyone everywhere,
+    # so a single candidate is checked against the others
+    i = max(range(n_players), key=lambda k: rows[k][0])
+    front, middle, back = rows[i]
+    has_best = all(
+        front > other_front and middle > other_middle and back > other_back
+        for j, (other_front, other_middle, other_back) in enumerate(rows)
+        if i != j
+    )
+    if has_best:
+        bonus_scores = [-6] * n_players
+        bonus_scores[i] = 18
+        return bonus_scores
+
+    return [0] * n_players
+
+
+def overall_bonus_vec(
+    evals: np.ndarray, others: List[np.ndarray], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Overall bonus of one player for each of its arrangements against fixed opponents.
+
+    Vectorized over the player's arrangements, with the same result as
+    calculate_overall_bonus_fast gives for that player.
+
+    Args:
+        evals: (n, 3) array of front, middle and back scores of the player's arrangements.
+        others: Front, middle and back scores of each opponent's arrangement.
+        out: Optional int64 array of length n to write the bonuses into.
+
+    Returns:
+        An int array of +18 where the arrangement beats every opponent in every
+        position, -6 where an opponent beats everyone in every position, else 0.
+    """
+    if out is None:
+        bonus = np.zeros(len(evals), dtype=np.int64)
+    else:
+        bonus = out
+        bonus.fill(0)
+    bonus[np.logical_and.reduce([(evals > other).all(axis=1) for other in others])] = 18
+    for q, other in enumerate(others):
+        beats_opponents = all((other > rival).all() for r, rival in enumerate(others) if r != q)
+        if beats_opponents:
+            bonus[(other > evals).all(axis=1)] = -6
+    return bonus
 
 
 def score_game(players_arrangements: List[Arrangement]) -> List[int]:
@@ -241,10 +390,37 @@ def score_game(players_arrangements: List[Arrangement]) -> List[int]:
     return [s + b for s, b in zip(scores, bonus_scores)]
 
 
+def score_game_vec(evals: np.ndarray) -> np.ndarray:
+    """Score games from the players' front, middle and back scores, as score_game does.
+
+    Broadcasts over any leading dimensions, so a whole batch of games is
+    scored in a few array operations.
+
+    Args:
+        evals: (..., n, 3) array of front, middle and back scores of each player's arrangement.
+
+    Returns:
+        An (..., n) int64 array of final scores for each player.
+    """
+    sign = np.sign(evals[..., :, None, :] - evals[..., None, :, :]).astype(np.int64)
+    bonus = np.stack(POSITION_BONUS)[np.arange(3), evals.astype(np.int64)]
+
+    # Points per pair and position: 1 plus the winner's bonus, signed by the result
+    points = np.where(sign > 0, bonus[..., :, None, :], bonus[..., None, :, :])
+    wins = (sign > 0).all(axis=-1)
+    pair_scores = (sign * (1 + points)).sum(axis=-1) + 3 * wins - 3 * (sign < 0).all(axis=-1)
+    scores = pair_scores.sum(axis=-1)
+
+    # Overall bonus: a player beating every other player in every position
+    is_winner = wins.sum(axis=-1) == evals.shape[-2] - 1
+    has_winner = is_winner.any(axis=-1, keepdims=True)
+    return scores + np.where(has_winner, np.where(is_winner, 18, -6), 0)
+
+
 def main() -> None:
     """Main function to demonstrate scoring and benchmark performance."""
     print("Loading evaluation dictionaries...")
-    three_card_dict, five_card_dict = load_evaluation_dicts("Dict/three_card.pkl", "Dict/five_card.pkl")
+    three_card_table, five_card_table = load_evaluation_dicts("Dict/three_card.pkl", "Dict/five_card.pkl")
 
     print("\nGenerating test game...")
     deck = Deck()
@@ -256,7 +432,7 @@ def main() -> None:
         print(f"\nPlayer {i + 1}'s hand ({len(hand)} cards):")
         print(" ".join(str(card) for card in sorted(hand, key=lambda c: (c.value, c.suit), reverse=True)))
 
-        arrangements = find_valid_arrangements(hand, three_card_dict, five_card_dict)
+        arrangements = find_valid_arrangements(hand, three_card_table, five_card_table)
         if not arrangements:
             print(f"No valid arrangements found for Player {i + 1}!")
             return
@@ -280,6 +456,12 @@ def main() -> None:
     print(f"Average time per game: {avg_time * 1000:.4f} milliseconds")
     print(f"Games per second: {1 / avg_time:,.1f}")
 
+    # The same number of games scored as one batch
+    evals = np.array([(a.front_eval, a.middle_eval, a.back_eval) for a in players_arrangements])
+    batch = np.broadcast_to(evals, (num_rounds,) + evals.shape)
+    vec_time = timeit.timeit(lambda: score_game_vec(batch), number=1)
+    print(f"Average time per game (score_game_vec batch): {vec_time / num_rounds * 1000:.4f} milliseconds")
+
     print("\nTest Game Final Scores:")
     final_scores = score_test()
     for i, score in enumerate(final_scores):